@@ -1,8 +1,14 @@
 from pathlib import Path
+from typing import Literal
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import (
+    BaseSettings,
+    JsonConfigSettingsSource,
+    PydanticBaseSettingsSource,
+)
 
 CONFIG_DIR = Path(__file__).parent.parent / "config"
+TOKEN_STORE_FILE = CONFIG_DIR / "tokens.json"
 
 
 class Settings(BaseSettings):
@@ -13,7 +19,91 @@ class Settings(BaseSettings):
     whoop_api_base_url: str = "https://api.prod.whoop.com/developer"
     whoop_token_url: str = "https://api.prod.whoop.com/oauth/oauth2/token"
 
-    model_config = {"env_file": CONFIG_DIR / ".env", "env_file_encoding": "utf-8"}
+    # Unix timestamp when the access token expires (written to the token store)
+    whoop_token_expires_at: float | None = None
+    # Refresh this many seconds before the access token expires
+    whoop_token_refresh_margin: float = 300.0
+
+    # HTTP connection pool shared by all requests to the WHOOP API
+    whoop_request_timeout: float = 30.0
+    whoop_max_connections: int = 10
+    whoop_max_keepalive_connections: int = 5
+    whoop_keepalive_expiry: float = 30.0
+    whoop_http2: bool = False
+
+    # Client-side rate limit, matching WHOOP's published per-app quotas
+    whoop_rate_limit_per_minute: int = 100
+    whoop_rate_limit_per_day: int = 10000
+    whoop_rate_limit_burst: int = 20
+    # Retries for 429, 5xx and connection errors; backoff in seconds
+    whoop_max_retries: int = 3
+    whoop_retry_backoff_base: float = 0.5
+    whoop_retry_backoff_max: float = 30.0
+
+    # Split start/end range queries into this many concurrently paginated sub-ranges
+    whoop_pagination_shards: int = 1
+    whoop_pagination_concurrency: int = 4
+
+    # Pages fetched ahead of validation in collection tools (0 disables prefetching)
+    whoop_prefetch_pages: int = 2
+
+    # In-memory cache for single-record endpoints (0 entries disables it); TTLs in seconds
+    whoop_cache_max_entries: int = 512
+    whoop_cache_final_ttl: float = 86400.0
+    whoop_cache_pending_ttl: float = 60.0
+    whoop_cache_user_ttl: float = 3600.0
+
+    # Local SQLite store that collection queries are served from (disabled when unset)
+    whoop_record_store_path: Path | None = None
+    # Skip the incremental sync if the store was synced this many seconds ago
+    whoop_record_store_sync_interval: float = 300.0
+    # Re-fetch this many hours before the last sync to catch late uploads and rescoring
+    whoop_record_store_lookback_hours: float = 48.0
+
+    # MCP transport; "http" serves streamable HTTP on host:port, with metrics at /metrics
+    whoop_transport: Literal["stdio", "http"] = "stdio"
+    whoop_http_host: str = "127.0.0.1"
+    whoop_http_port: int = 8000
+
+    # Trace spans for tool calls, pages, HTTP attempts, validation and serialization:
+    # "off", "console" (stderr) or "file" (JSON lines appended to WHOOP_TRACE_FILE)
+    whoop_tracing: Literal["off", "console", "file"] = "off"
+    whoop_trace_file: Path = CONFIG_DIR / "traces.jsonl"
+
+    # Profile tool calls: "cprofile" (deterministic) or "sample" (stack sampling every
+    # WHOOP_PROFILE_INTERVAL seconds). Tools are comma-separated (empty profiles all of them)
+    whoop_profile_mode: Literal["off", "cprofile", "sample"] = "off"
+    whoop_profile_tools: str = ""
+    whoop_profile_sample_rate: float = 1.0
+    whoop_profile_interval: float = 0.005
+    # Only keep profiles of calls taking at least this many seconds
+    whoop_profile_min_seconds: float = 0.0
+    whoop_profile_dir: Path = CONFIG_DIR / "profiles"
+
+    model_config = {
+        "env_file": CONFIG_DIR / ".env",
+        "env_file_encoding": "utf-8",
+        "json_file": TOKEN_STORE_FILE,
+    }
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        # Tokens persisted after a refresh are newer than the ones in the environment,
+        # and with refresh-token rotation the stored refresh token is the only valid one.
+        return (
+            init_settings,
+            JsonConfigSettingsSource(settings_cls),
+            env_settings,
+            dotenv_settings,
+            file_secret_settings,
+        )
 
 
 settings = Settings()
@@ -1,25 +1,60 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
 
+from app.config import settings
+from app.services.metrics import MetricsMiddleware
+from app.services.profiling import ProfilingMiddleware
+from app.services.record_store import record_store
+from app.services.tracing import TracingMiddleware
+from app.services.whoop_client import client
+from app.tools.analytics import register_analytics_tools
 from app.tools.cycles import register_cycle_tools
+from app.tools.daily import register_daily_tools
+from app.tools.diagnostics import register_diagnostic_resources
 from app.tools.recovery import register_recovery_tools
 from app.tools.sleep import register_sleep_tools
 from app.tools.user import register_user_tools
 from app.tools.workouts import register_workout_tools
 
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Refresh the token ahead of expiry while running; close the connection pool on shutdown."""
+    client.start_token_refresh()
+    try:
+        yield
+    finally:
+        await client.aclose()
+        if record_store is not None:
+            record_store.close()
+
+
 mcp = FastMCP(
     "whoop",
     instructions="MCP server for WHOOP wearable health data",
+    lifespan=lifespan,
 )
+mcp.add_middleware(MetricsMiddleware())
+mcp.add_middleware(TracingMiddleware())
+mcp.add_middleware(ProfilingMiddleware())
 
 register_user_tools(mcp)
 register_cycle_tools(mcp)
 register_sleep_tools(mcp)
 register_recovery_tools(mcp)
 register_workout_tools(mcp)
+register_daily_tools(mcp)
+register_analytics_tools(mcp)
+register_diagnostic_resources(mcp)
 
 
 def main():
-    mcp.run(transport="stdio")
+    if settings.whoop_transport == "http":
+        mcp.run(transport="http", host=settings.whoop_http_host, port=settings.whoop_http_port)
+    else:
+        mcp.run(transport="stdio")
 
 
 if __name__ == "__main__":
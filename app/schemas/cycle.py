@@ -1,6 +1,9 @@
 from datetime import date, datetime
+from functools import cached_property
 
-from pydantic import BaseModel, computed_field, field_serializer
+from pydantic import BaseModel, computed_field, field_serializer, model_validator
+
+from app.utils.timezone import format_local_datetime, local_day, localize_timestamps
 
 
 class CycleScore(BaseModel):
@@ -21,15 +24,25 @@ class Cycle(BaseModel):
     created_at: datetime | None = None
     updated_at: datetime | None = None
 
+    @model_validator(mode="after")
+    def localize(self) -> "Cycle":
+        """Convert timestamps to the user's timezone at the time of the cycle."""
+        return localize_timestamps(self)
+
     @field_serializer("start", "end", "created_at", "updated_at")
     def serialize_datetime(self, value: datetime | None) -> str | None:
         """Format datetime with timezone offset for display."""
         if value is None:
             return None
         if self.timezone_offset:
-            return f"{value.strftime('%Y-%m-%d %I:%M %p')} ({self.timezone_offset})"
+            return format_local_datetime(value, self.timezone_offset)
         return value.isoformat()
 
+    @cached_property
+    def _day(self) -> tuple[date, str, bool]:
+        """Date, weekday and weekend flag, computed once per record from the end time."""
+        return local_day(self.end if self.end is not None else self.start)
+
     @computed_field
     @property
     def duration_hours(self) -> float | None:
@@ -43,19 +56,16 @@ class Cycle(BaseModel):
     @property
     def date(self) -> date:
         """Date of the cycle (based on end time, falls back to start if ongoing)."""
-        dt = self.end if self.end is not None else self.start
-        return dt.date()
+        return self._day[0]
 
     @computed_field
     @property
     def weekday(self) -> str:
         """Day of week (e.g., 'Monday'). Based on end time, falls back to start if ongoing."""
-        dt = self.end if self.end is not None else self.start
-        return dt.strftime("%A")
+        return self._day[1]
 
     @computed_field
     @property
     def is_weekend(self) -> bool:
         """Whether it falls on a weekend. Based on end time, falls back to start if ongoing."""
-        dt = self.end if self.end is not None else self.start
-        return dt.weekday() >= 5
+        return self._day[2]
@@ -0,0 +1,194 @@
+from functools import cache
+from typing import Any, Generic, NotRequired, TypeVar, get_args
+
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class Page(TypedDict, Generic[T]):
+    """One page of a WHOOP collection response."""
+
+    records: list[T]
+    next_token: NotRequired[str | None]
+
+
+@cache
+def page_adapter(model: type[T]) -> TypeAdapter[Page[T]]:
+    """Cached adapter that decodes a whole raw JSON page into models in one call."""
+    return TypeAdapter(Page[model])
+
+
+@cache
+def records_adapter(model: type[T]) -> TypeAdapter[list[T]]:
+    """Cached adapter for validating and dumping lists of records in one call."""
+    return TypeAdapter(list[model])
+
+
+def dump_records(model: type[T], records: list[Any], include: dict | None = None) -> list[dict]:
+    """Serialize validated records (or validate raw dicts first) in one pass.
+
+    `include` is a pydantic include spec (see `field_include`) applied by the
+    serializer itself, so projected-away fields are never dumped.
+    """
+    adapter = records_adapter(model)
+    if records and not isinstance(records[0], model):
+        records = adapter.validate_python(records)
+    return adapter.dump_python(records, include=include)
+
+
+def dump_records_json(model: type[T], records: list[Any]) -> bytes:
+    """Serialize validated records straight to JSON bytes, skipping intermediate dicts.
+
+    Tools return dicts (see `dump_records`) for FastMCP to encode; only the
+    serialization benchmark uses this, as a reference point for that path.
+    """
+    adapter = records_adapter(model)
+    if records and not isinstance(records[0], model):
+        records = adapter.validate_python(records)
+    return adapter.dump_json(records)
+
+
+def _nested_model(model: type[BaseModel], name: str) -> type[BaseModel] | None:
+    field = model.model_fields.get(name)
+    if field is None:
+        return None
+    for candidate in (field.annotation, *get_args(field.annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+def field_include(model: type[BaseModel], fields: list[str]) -> dict:
+    """Build a per-record include spec for `dump_records` from field names.
+
+    Names are top-level fields or computed fields ("date"), or dotted paths into
+    nested models ("score.strain", "score.stage_summary.total_rem_sleep_time_milli").
+
+    Raises:
+        ValueError: If a name doesn't exist on the model
+    """
+    include: dict[str, Any] = {}
+    for name in fields:
+        node, current = include, model
+        parts = name.split(".")
+        for depth, part in enumerate(parts):
+            known = current is not None and (
+                part in current.model_fields or part in current.model_computed_fields
+            )
+            if not known:
+                raise ValueError(f"Unknown field '{name}' for {model.__name__}")
+            if depth == len(parts) - 1:
+                node[part] = True
+                break
+            child = node.setdefault(part, {})
+            if child is True:
+                # The whole parent is already included
+                break
+            node, current = child, _nested_model(current, part)
+    return {"__all__": include}
+
+
+def _drop_nulls(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _drop_nulls(v) for k, v in value.items() if v is not None}
+    return value
+
+
+def compact_records(records: list[dict]) -> tuple[dict[str, Any], list[dict]]:
+    """Drop nulls and lift values shared by every record into a header.
+
+    A top-level scalar is lifted only when every record has it with the same
+    value (e.g. user_id, timezone_offset for a user who didn't travel), so the
+    original rows can be rebuilt as `{**constants, **record}` minus the nulls.
+
+    Returns:
+        (constants, records) with the constant keys removed from each record
+    """
+    records = [_drop_nulls(record) for record in records]
+    if len(records) < 2:
+        return {}, records
+    first, *rest = records
+    constants = {
+        key: value
+        for key, value in first.items()
+        if not isinstance(value, (dict, list))
+        and all(key in record and record[key] == value for record in rest)
+    }
+    if constants:
+        records = [{k: v for k, v in record.items() if k not in constants} for record in records]
+    return constants, records
+
+
+@cache
+def column_paths(model: type[BaseModel]) -> tuple[tuple[str, ...], ...]:
+    """Leaf field paths of a model in dump order, recursing into nested models.
+
+    E.g. Sleep yields ("id",), ..., ("score", "stage_summary", "total_in_bed_time_milli"),
+    ..., ("date",), ("weekday",), ("is_weekend",).
+    """
+    paths: list[tuple[str, ...]] = []
+    for name in (*model.model_fields, *model.model_computed_fields):
+        nested = _nested_model(model, name)
+        if nested is None:
+            paths.append((name,))
+        else:
+            paths.extend((name, *sub) for sub in column_paths(nested))
+    return tuple(paths)
+
+
+def _is_included(path: tuple[str, ...], include: dict) -> bool:
+    node: Any = include["__all__"]
+    for part in path:
+        node = node.get(part)
+        if node is None:
+            return False
+        if node is True:
+            return True
+    return True
+
+
+def _lookup(row: dict, path: tuple[str, ...]) -> Any:
+    value: Any = row
+    for part in path:
+        if value is None:
+            return None
+        value = value[part]
+    return value
+
+
+def dump_columns(
+    model: type[T], records: list[Any], include: dict | None = None
+) -> dict[str, list]:
+    """Serialize records into one list per leaf field, keyed by dotted path.
+
+    Nested objects are flattened ("score.stage_summary.total_rem_sleep_time_milli"),
+    and every column has one entry per record, None where the record (or a
+    parent object such as an unscored `score`) has no value.
+    """
+    rows = dump_records(model, records, include)
+    return {
+        ".".join(path): [_lookup(row, path) for row in rows]
+        for path in column_paths(model)
+        if include is None or _is_included(path, include)
+    }
+
+
+def compact_columns(columns: dict[str, list]) -> tuple[dict[str, Any], dict[str, list]]:
+    """Drop all-null columns and lift single-valued columns into a header.
+
+    Returns:
+        (constants, columns) with constant and all-null columns removed
+    """
+    constants: dict[str, Any] = {}
+    varying: dict[str, list] = {}
+    for name, values in columns.items():
+        if all(value is None for value in values):
+            continue
+        first = values[0]
+        if len(values) > 1 and all(value == first for value in values):
+            constants[name] = first
+        else:
+            varying[name] = values
+    return constants, varying
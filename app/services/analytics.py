@@ -0,0 +1,472 @@
+"""Vectorized aggregation over fetched WHOOP history.
+
+Records are serialized straight into columns (see `dump_columns`), turned into
+NumPy arrays once, and every statistic is computed with array operations, so
+tools can answer trend questions by returning a summary instead of the records.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from app.schemas.cycle import Cycle
+from app.schemas.page import dump_columns, field_include
+from app.schemas.recovery import Recovery
+from app.schemas.sleep import Sleep
+from app.schemas.workout import Workout
+from app.services.collections import get_collection
+from app.services.fanout import fan_out
+from app.utils.timezone import WEEKDAY_NAMES
+
+PERIODS = ("day", "week", "month")
+PERCENTILES = (5, 25, 50, 75, 95)
+MILLI_PER_HOUR = 3_600_000
+
+COLLECTIONS = {
+    "cycle": ("/v2/cycle", Cycle),
+    "sleep": ("/v2/activity/sleep", Sleep),
+    "recovery": ("/v2/recovery", Recovery),
+    "workout": ("/v2/activity/workout", Workout),
+}
+
+# Day columns every series carries; recoveries borrow them from their cycle
+DAY_COLUMNS = ("date", "weekday", "is_weekend")
+
+ZONES = ("zero", "one", "two", "three", "four", "five")
+ZONE_COLUMNS = tuple(f"score.zone_duration.zone_{zone}_milli" for zone in ZONES)
+LOAD_COLUMNS = ("score.strain", "score.kilojoule", "score.distance_meter")
+MILLI_PER_MINUTE = 60_000
+
+DEFAULT_SLEEP_METRICS = ("sleep_hours", "deep_sleep_hours", "rem_sleep_hours", "sleep_efficiency")
+DEFAULT_RECOVERY_METRICS = ("recovery_score", "hrv", "resting_heart_rate")
+MAX_LAG = 14
+
+
+@dataclass(frozen=True)
+class Metric:
+    """A numeric series derived from one collection.
+
+    `columns` are summed per record (e.g. the three sleep stages make up total
+    sleep) and multiplied by `scale`.
+    """
+
+    collection: str
+    columns: tuple[str, ...]
+    unit: str
+    scale: float = 1.0
+
+
+METRICS = {
+    "recovery_score": Metric("recovery", ("score.recovery_score",), "%"),
+    "hrv": Metric("recovery", ("score.hrv_rmssd_milli",), "ms"),
+    "resting_heart_rate": Metric("recovery", ("score.resting_heart_rate",), "bpm"),
+    "spo2": Metric("recovery", ("score.spo2_percentage",), "%"),
+    "skin_temp": Metric("recovery", ("score.skin_temp_celsius",), "celsius"),
+    "sleep_performance": Metric("sleep", ("score.sleep_performance_percentage",), "%"),
+    "sleep_efficiency": Metric("sleep", ("score.sleep_efficiency_percentage",), "%"),
+    "sleep_consistency": Metric("sleep", ("score.sleep_consistency_percentage",), "%"),
+    "respiratory_rate": Metric("sleep", ("score.respiratory_rate",), "breaths/min"),
+    "sleep_hours": Metric(
+        "sleep",
+        (
+            "score.stage_summary.total_light_sleep_time_milli",
+            "score.stage_summary.total_slow_wave_sleep_time_milli",
+            "score.stage_summary.total_rem_sleep_time_milli",
+        ),
+        "hours",
+        1 / MILLI_PER_HOUR,
+    ),
+    "deep_sleep_hours": Metric(
+        "sleep",
+        ("score.stage_summary.total_slow_wave_sleep_time_milli",),
+        "hours",
+        1 / MILLI_PER_HOUR,
+    ),
+    "rem_sleep_hours": Metric(
+        "sleep", ("score.stage_summary.total_rem_sleep_time_milli",), "hours", 1 / MILLI_PER_HOUR
+    ),
+    "strain": Metric("cycle", ("score.strain",), "strain"),
+    "kilojoule": Metric("cycle", ("score.kilojoule",), "kJ"),
+    "average_heart_rate": Metric("cycle", ("score.average_heart_rate",), "bpm"),
+    "workout_strain": Metric("workout", ("score.strain",), "strain"),
+    "workout_kilojoule": Metric("workout", ("score.kilojoule",), "kJ"),
+    "workout_distance": Metric("workout", ("score.distance_meter",), "meters"),
+}
+
+
+@dataclass
+class Series:
+    """One value per record with the record's local day, sorted oldest first."""
+
+    days: np.ndarray  # datetime64[D]
+    weekdays: np.ndarray  # 0 = Monday
+    weekend: np.ndarray  # bool
+    values: np.ndarray  # float64, no NaNs
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list], values: np.ndarray) -> "Series":
+        """Build from `dump_columns` output, dropping records without a value."""
+        weekday_index = {name: i for i, name in enumerate(WEEKDAY_NAMES)}
+        days = np.array(columns["date"], dtype="datetime64[D]")
+        weekdays = np.array([weekday_index[w] for w in columns["weekday"]], dtype=np.int8)
+        weekend = np.array(columns["is_weekend"], dtype=bool)
+        keep = ~np.isnan(values)
+        order = np.argsort(days[keep], kind="stable")
+        return cls(
+            days[keep][order], weekdays[keep][order], weekend[keep][order], values[keep][order]
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def column_array(
+    columns: dict[str, list], names: tuple[str, ...], scale: float = 1.0
+) -> np.ndarray:
+    """Sum columns element-wise as float64, with None as NaN."""
+    total = np.zeros(len(columns[names[0]]))
+    for name in names:
+        total += np.array(columns[name], dtype=float)
+    return total * scale
+
+
+def _round(values: np.ndarray) -> list[float]:
+    return np.round(values, 2).tolist()
+
+
+def group_stats(keys: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Mean/min/max/sum/count of `values` per distinct key, keys sorted ascending."""
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    count = np.bincount(inverse, minlength=len(uniq))
+    total = np.bincount(inverse, weights=values, minlength=len(uniq))
+    low = np.full(len(uniq), np.inf)
+    high = np.full(len(uniq), -np.inf)
+    np.minimum.at(low, inverse, values)
+    np.maximum.at(high, inverse, values)
+    return uniq, {"mean": total / count, "min": low, "max": high, "sum": total, "count": count}
+
+
+def period_starts(days: np.ndarray, period: str) -> np.ndarray:
+    """First day of the day/week (Monday)/month each day falls in."""
+    if period == "day":
+        return days
+    if period == "week":
+        # 1970-01-01 was a Thursday, so day 0 is weekday 3
+        return days - (days.astype(np.int64) + 3) % 7
+    return days.astype("datetime64[M]").astype("datetime64[D]")
+
+
+def rollup(series: Series, period: str) -> list[dict[str, Any]]:
+    """Per-period statistics, oldest first."""
+    starts, stats = group_stats(period_starts(series.days, period), series.values)
+    rounded = {name: _round(values) for name, values in stats.items() if name != "count"}
+    return [
+        {
+            "period_start": str(start),
+            **{name: values[i] for name, values in rounded.items()},
+            "count": int(stats["count"][i]),
+        }
+        for i, start in enumerate(starts)
+    ]
+
+
+def rolling_mean(series: Series, window: int) -> list[dict[str, Any]]:
+    """Trailing `window`-calendar-day mean, reported for each day that has data.
+
+    Days without records don't count as zeros; the mean is over the records
+    that fall inside the window.
+    """
+    offsets = (series.days - series.days[0]).astype(np.int64)
+    span = int(offsets[-1]) + 1
+    sums = np.concatenate(([0.0], np.cumsum(np.bincount(offsets, series.values, span))))
+    counts = np.concatenate(([0], np.cumsum(np.bincount(offsets, minlength=span))))
+    ends = np.unique(offsets) + 1
+    starts = np.maximum(ends - window, 0)
+    means = (sums[ends] - sums[starts]) / (counts[ends] - counts[starts])
+    days = series.days[0] + (ends - 1)
+    return [{"date": str(day), "mean": mean} for day, mean in zip(days, _round(means), strict=True)]
+
+
+def percentiles(values: np.ndarray) -> dict[str, float]:
+    """Selected percentiles, keyed like "p50"."""
+    points = _round(np.percentile(values, PERCENTILES))
+    return {f"p{q}": point for q, point in zip(PERCENTILES, points, strict=True)}
+
+
+def _entry(stats: dict[str, np.ndarray], i: int) -> dict[str, Any]:
+    return {"mean": round(float(stats["mean"][i]), 2), "count": int(stats["count"][i])}
+
+
+def weekday_split(series: Series) -> dict[str, Any]:
+    """Mean and count per weekday and for weekdays vs weekends."""
+    days, by_day = group_stats(series.weekdays, series.values)
+    flags, by_flag = group_stats(series.weekend, series.values)
+    split = {bool(flag): _entry(by_flag, i) for i, flag in enumerate(flags)}
+    return {
+        "by_weekday": {WEEKDAY_NAMES[day]: _entry(by_day, i) for i, day in enumerate(days)},
+        "weekday": split.get(False),
+        "weekend": split.get(True),
+    }
+
+
+def summarize(series: Series, period: str = "week", window: int | None = None) -> dict[str, Any]:
+    """Overall statistics, percentiles, period rollup, weekday split and optional rolling mean."""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIODS)}")
+    if not len(series):
+        return {"count": 0}
+    values = series.values
+    summary: dict[str, Any] = {
+        "count": len(series),
+        "first_date": str(series.days[0]),
+        "last_date": str(series.days[-1]),
+        "mean": round(float(values.mean()), 2),
+        "std": round(float(values.std()), 2),
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+        "percentiles": percentiles(values),
+        "rollup": rollup(series, period),
+        **weekday_split(series),
+    }
+    if window:
+        summary["rolling_mean"] = rolling_mean(series, window)
+    return summary
+
+
+def _load_entry(workouts: int, sums: np.ndarray, counts: np.ndarray) -> dict[str, Any]:
+    zones = len(ZONE_COLUMNS)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = np.where(counts > 0, sums / counts, np.nan)
+    totals, means = _round(sums), [None if np.isnan(v) else v for v in _round(averages)]
+    return {
+        "workouts": workouts,
+        "total": {
+            "zone_minutes": totals[:zones],
+            **dict(zip(("strain", "kilojoule", "distance_meter"), totals[zones:], strict=True)),
+        },
+        "average": {
+            "zone_minutes": means[:zones],
+            **dict(zip(("strain", "kilojoule", "distance_meter"), means[zones:], strict=True)),
+        },
+    }
+
+
+def _grouped_load(
+    keys: np.ndarray, filled: np.ndarray, present: np.ndarray
+) -> tuple[np.ndarray, list[dict[str, Any]]]:
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    sums = np.zeros((len(uniq), filled.shape[1]))
+    counts = np.zeros((len(uniq), filled.shape[1]))
+    np.add.at(sums, inverse, filled)
+    np.add.at(counts, inverse, present)
+    workouts = np.bincount(inverse, minlength=len(uniq)).tolist()
+    return uniq, [_load_entry(workouts[i], sums[i], counts[i]) for i in range(len(uniq))]
+
+
+def training_load(columns: dict[str, list]) -> dict[str, Any]:
+    """Time in HR zone, strain, kJ and distance totals and averages per sport and per week.
+
+    The workout columns become one (workouts x metrics) matrix, with zone times
+    in minutes; each grouping is a single `np.add.at` over it. Averages are per
+    workout that reported the value.
+    """
+    if not columns["date"]:
+        return {"workouts": 0}
+    matrix = np.column_stack(
+        [np.array(columns[name], dtype=float) for name in (*ZONE_COLUMNS, *LOAD_COLUMNS)]
+    )
+    matrix[:, : len(ZONE_COLUMNS)] /= MILLI_PER_MINUTE
+    present = ~np.isnan(matrix)
+    filled = np.where(present, matrix, 0.0)
+    days = np.array(columns["date"], dtype="datetime64[D]")
+    sports = np.array(columns["sport_id"], dtype=np.int64)
+
+    everything = _load_entry(len(days), filled.sum(axis=0), present.sum(axis=0))
+    sport_ids, by_sport = _grouped_load(sports, filled, present)
+    weeks, by_week = _grouped_load(period_starts(days, "week"), filled, present)
+    return {
+        "first_date": str(days.min()),
+        "last_date": str(days.max()),
+        **everything,
+        "by_sport": [
+            {"sport_id": sport_id, **entry}
+            for sport_id, entry in zip(sport_ids.tolist(), by_sport, strict=True)
+        ],
+        "by_week": [
+            {"week_start": str(week), **entry}
+            for week, entry in zip(weeks, by_week, strict=True)
+        ],
+    }
+
+
+async def fetch_columns(
+    collection: str, names: tuple[str, ...], params: dict, limit: int
+) -> dict[str, list]:
+    """Fetch a collection and serialize only the named columns."""
+    path, model = COLLECTIONS[collection]
+    response = await get_collection(path, params, limit)
+    return dump_columns(model, response["records"], field_include(model, list(names)))
+
+
+async def load_series(metric: Metric, params: dict, limit: int) -> Series:
+    """Fetch the records behind a metric and reduce them to a Series.
+
+    Naps are left out of sleep metrics. Recoveries carry no timestamps of their
+    own, so they take the day fields of their cycle via a cycle_id index.
+    """
+    if metric.collection == "recovery":
+        recoveries, cycles = await fan_out(
+            fetch_columns("recovery", ("cycle_id", *metric.columns), params, limit),
+            fetch_columns("cycle", ("id", *DAY_COLUMNS), params, limit),
+        )
+        position = {cycle_id: i for i, cycle_id in enumerate(cycles["id"])}
+        rows = [position.get(cycle_id) for cycle_id in recoveries["cycle_id"]]
+        matched = [i for i, row in enumerate(rows) if row is not None]
+        columns = {
+            **{name: [cycles[name][rows[i]] for i in matched] for name in DAY_COLUMNS},
+            **{name: [recoveries[name][i] for i in matched] for name in metric.columns},
+        }
+    else:
+        extra = ("nap",) if metric.collection == "sleep" else ()
+        columns = await fetch_columns(
+            metric.collection, (*DAY_COLUMNS, *extra, *metric.columns), params, limit
+        )
+        if extra:
+            keep = [i for i, nap in enumerate(columns["nap"]) if not nap]
+            columns = {name: [values[i] for i in keep] for name, values in columns.items()}
+    return Series.from_columns(columns, column_array(columns, metric.columns, metric.scale))
+
+
+async def load_workout_columns(params: dict, limit: int) -> dict[str, list]:
+    """Fetch workouts with just the columns `training_load` needs."""
+    return await fetch_columns(
+        "workout", ("date", "sport_id", *ZONE_COLUMNS, *LOAD_COLUMNS), params, limit
+    )
+
+
+def join_sleep_recovery(
+    sleeps: dict[str, list], recoveries: dict[str, list]
+) -> tuple[list[int], list[int]]:
+    """Match each recovery to the sleep it was scored from, in O(n).
+
+    Recoveries point at their sleep through sleep_id; when that sleep isn't in
+    the fetched range the primary (non-nap) sleep with the same cycle_id is
+    used instead. Both lookups are dict indexes over the sleep columns.
+
+    Returns:
+        Parallel (sleep row, recovery row) index lists for the matched pairs
+    """
+    sleep_by_id = {sleep_id: i for i, sleep_id in enumerate(sleeps["id"])}
+    primary_by_cycle = {
+        cycle_id: i
+        for i, (cycle_id, nap) in enumerate(zip(sleeps["cycle_id"], sleeps["nap"], strict=True))
+        if cycle_id is not None and not nap
+    }
+    sleep_rows, recovery_rows = [], []
+    pairs = zip(recoveries["sleep_id"], recoveries["cycle_id"], strict=True)
+    for j, (sleep_id, cycle_id) in enumerate(pairs):
+        i = sleep_by_id.get(sleep_id)
+        if i is None:
+            i = primary_by_cycle.get(cycle_id)
+        if i is not None:
+            sleep_rows.append(i)
+            recovery_rows.append(j)
+    return sleep_rows, recovery_rows
+
+
+def lagged_correlations(
+    days: np.ndarray, x: np.ndarray, y: np.ndarray, lags: range
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pearson r between every x column and every y column, with y shifted by each lag.
+
+    Rows are laid out on a calendar so lag k pairs x on day d with y on day
+    d + k; missing values (NaN) drop out pair by pair. All pairs of a lag are
+    computed at once from masked sums.
+
+    Args:
+        days: datetime64[D] per row
+        x: (rows x a) values, e.g. sleep metrics
+        y: (rows x b) values, e.g. recovery metrics
+        lags: Day offsets to evaluate
+
+    Returns:
+        (r, n) arrays of shape (lags x a x b); r is NaN where n < 3 or a series is flat
+    """
+    offsets = (days - days.min()).astype(np.int64)
+    span = int(offsets.max()) + 1
+    x_days = np.full((span, x.shape[1]), np.nan)
+    y_days = np.full((span, y.shape[1]), np.nan)
+    x_days[offsets] = x
+    y_days[offsets] = y
+
+    r = np.full((len(lags), x.shape[1], y.shape[1]), np.nan)
+    n = np.zeros((len(lags), x.shape[1], y.shape[1]), dtype=np.int64)
+    for k, lag in enumerate(lags):
+        if lag >= span:
+            continue
+        xs, ys = x_days[: span - lag, :, None], y_days[lag:, None, :]
+        both = ~np.isnan(xs) & ~np.isnan(ys)
+        xs, ys = np.where(both, xs, 0.0), np.where(both, ys, 0.0)
+        count = both.sum(axis=0)
+        sx, sy = xs.sum(axis=0), ys.sum(axis=0)
+        cov = count * (xs * ys).sum(axis=0) - sx * sy
+        var = (count * (xs * xs).sum(axis=0) - sx**2) * (count * (ys * ys).sum(axis=0) - sy**2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r[k] = np.where((count >= 3) & (var > 0), cov / np.sqrt(var), np.nan)
+        n[k] = count
+    return r, n
+
+
+def _optional(values: np.ndarray) -> list[float | None]:
+    return [None if np.isnan(v) else v for v in _round(values)]
+
+
+async def sleep_recovery_analysis(
+    sleep_metrics: list[str],
+    recovery_metrics: list[str],
+    params: dict,
+    limit: int,
+    max_lag: int,
+) -> dict[str, Any]:
+    """Fetch sleeps and recoveries, join them and correlate the chosen metrics."""
+    sleep_defs = [METRICS[name] for name in sleep_metrics]
+    recovery_defs = [METRICS[name] for name in recovery_metrics]
+    sleep_columns = tuple(c for m in sleep_defs for c in m.columns)
+    recovery_columns = tuple(c for m in recovery_defs for c in m.columns)
+    sleeps, recoveries = await fan_out(
+        fetch_columns("sleep", ("id", "cycle_id", "nap", "date", *sleep_columns), params, limit),
+        fetch_columns("recovery", ("sleep_id", "cycle_id", *recovery_columns), params, limit),
+    )
+    sleep_rows, recovery_rows = join_sleep_recovery(sleeps, recoveries)
+    if not sleep_rows:
+        return {"pairs": 0}
+
+    days = np.array(sleeps["date"], dtype="datetime64[D]")[sleep_rows]
+    x = np.column_stack([column_array(sleeps, m.columns, m.scale) for m in sleep_defs])[sleep_rows]
+    y = np.column_stack(
+        [column_array(recoveries, m.columns, m.scale) for m in recovery_defs]
+    )[recovery_rows]
+    order = np.argsort(days, kind="stable")
+    days, x, y = days[order], x[order], y[order]
+
+    lags = range(max_lag + 1)
+    r, n = lagged_correlations(days, x, y, lags)
+    return {
+        "pairs": len(days),
+        "first_date": str(days[0]),
+        "last_date": str(days[-1]),
+        "lags": list(lags),
+        "correlations": {
+            recovery: {
+                sleep: {"r": _optional(r[:, i, j]), "n": n[:, i, j].tolist()}
+                for i, sleep in enumerate(sleep_metrics)
+            }
+            for j, recovery in enumerate(recovery_metrics)
+        },
+        "series": {
+            "date": [str(day) for day in days],
+            **{name: _optional(x[:, i]) for i, name in enumerate(sleep_metrics)},
+            **{name: _optional(y[:, j]) for j, name in enumerate(recovery_metrics)},
+        },
+    }
@@ -0,0 +1,85 @@
+"""In-memory TTL/LRU cache for single-record WHOOP API responses.
+
+Scored records that have ended are effectively immutable and are kept much
+longer than ongoing or unscored ones, which WHOOP may still update.
+"""
+
+import copy
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from app.config import settings
+
+# Endpoints returning one cycle, sleep, workout or recovery record
+RECORD_PATHS = re.compile(
+    r"^/v2/(cycle/\d+(/sleep|/recovery)?|activity/(sleep|workout)/[^/]+)$"
+)
+USER_PATHS = re.compile(r"^/v2/user/")
+
+
+def is_final(record: dict) -> bool:
+    """Whether a record is scored and, if it has an end, has ended."""
+    return record.get("score_state") == "SCORED" and (
+        "end" not in record or record["end"] is not None
+    )
+
+
+def cache_ttl(path: str, response: dict) -> float:
+    """Seconds to cache a response for, or 0 if the endpoint isn't cacheable."""
+    if USER_PATHS.match(path):
+        return settings.whoop_cache_user_ttl
+    if RECORD_PATHS.match(path):
+        if is_final(response):
+            return settings.whoop_cache_final_ttl
+        return settings.whoop_cache_pending_ttl
+    return 0
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> dict | None:
+        """Return a copy of the cached response, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self._clock():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers convert timestamps in place, so never hand out the cached dict
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: str, value: dict, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (self._clock() + ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,161 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any, TypeVar
+
+from fastmcp import Context
+from pydantic import BaseModel
+
+from app.config import settings
+from app.schemas.page import (
+    compact_columns,
+    compact_records,
+    dump_columns,
+    dump_records,
+    field_include,
+)
+from app.services import metrics, tracing
+from app.services.record_store import record_store
+from app.services.whoop_client import DEFAULT_LIMIT, MAX_LIMIT, client
+
+T = TypeVar("T")
+
+# Marks the end of the producer's pages in the prefetch queue
+_DONE = object()
+
+
+async def get_collection(
+    path: str,
+    params: dict | None = None,
+    limit: int = DEFAULT_LIMIT,
+) -> dict[str, Any]:
+    """Fetch a collection from the local record store when enabled, otherwise from the API."""
+    if record_store is not None:
+        return await record_store.get_paginated(client, path, params, limit)
+    return await client.get_paginated(path, params, limit)
+
+
+async def get_all_collection(path: str, params: dict | None = None) -> list[dict]:
+    """Fetch every record of a collection matching params, beyond MAX_LIMIT if need be."""
+    if record_store is not None:
+        return await record_store.get_all(client, path, params)
+    return await client.get_all(path, params)
+
+
+async def iter_collection(
+    path: str,
+    params: dict | None = None,
+    limit: int = DEFAULT_LIMIT,
+    model: type[BaseModel] | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield pages of a collection; the record store answers in a single page.
+
+    With `model`, pages from the API are decoded into models; record store pages
+    always hold raw dicts.
+    """
+    if record_store is not None:
+        yield await record_store.get_paginated(client, path, params, limit)
+        return
+    async for page in client.iter_pages(path, params, limit, model=model):
+        yield page
+
+
+async def prefetch(items: AsyncIterator[T], depth: int) -> AsyncIterator[T]:
+    """Run an async iterator ahead of its consumer, buffering up to `depth` items.
+
+    The next page request is already in flight while the caller processes the
+    current one; the bounded queue applies backpressure so the producer never
+    gets more than `depth` pages ahead. Errors from the producer are re-raised
+    to the consumer, and the producer is cancelled if the consumer stops early.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+
+    async def produce() -> None:
+        try:
+            async for item in items:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+async def fetch_collection(
+    path: str,
+    params: dict | None,
+    limit: int,
+    model: type[BaseModel],
+    ctx: Context | None = None,
+    fields: list[str] | None = None,
+    compact: bool = False,
+    columnar: bool = False,
+) -> dict[str, Any]:
+    """Fetch a collection, validating and serializing each page as it arrives.
+
+    Pages are decoded from raw JSON into models (localizing timestamps in the
+    same pass) and dumped in batches, and progress (records so far out of
+    limit) is reported through the MCP context after every page. Up to
+    WHOOP_PREFETCH_PAGES pages are fetched ahead while earlier ones are parsed.
+
+    Args:
+        path: Collection endpoint, e.g. "/v2/cycle"
+        params: Query params such as start/end
+        limit: Max records to return (max 1000)
+        model: Pydantic model each record is parsed into
+        ctx: FastMCP context for progress notifications
+        fields: Only serialize these fields (dotted paths reach into nested models)
+        compact: Drop nulls and lift values shared by every record into `constants`
+        columnar: Return `columns` (one list per flattened field) instead of records
+
+    Returns:
+        records (serialized models) or columns, has_more and next_token, plus
+        constants when compact
+
+    Raises:
+        ValueError: If `fields` names a field the model doesn't have
+    """
+    include = field_include(model, fields) if fields else None
+    total = min(limit, MAX_LIMIT)
+    count = 0
+    records: list[dict] = []
+    columns: dict[str, list] = dump_columns(model, [], include) if columnar else {}
+    page: dict[str, Any] = {"has_more": False, "next_token": None}
+    pages = iter_collection(path, params, limit, model)
+    if settings.whoop_prefetch_pages > 0:
+        pages = prefetch(pages, settings.whoop_prefetch_pages)
+    async for page in pages:
+        with (
+            metrics.STAGE_DURATION.time(stage="serialize", model=model.__name__),
+            tracing.span("whoop.serialize", model=model.__name__, records=len(page["records"])),
+        ):
+            if columnar:
+                for name, values in dump_columns(model, page["records"], include).items():
+                    columns[name].extend(values)
+            else:
+                records.extend(dump_records(model, page["records"], include))
+        count += len(page["records"])
+        if ctx is not None:
+            await ctx.report_progress(count, total)
+    result: dict[str, Any] = {}
+    if columnar:
+        if compact:
+            result["constants"], columns = compact_columns(columns)
+        result["columns"] = columns
+    else:
+        if compact:
+            result["constants"], records = compact_records(records)
+        result["records"] = records
+    result.update(has_more=page["has_more"], next_token=page["next_token"])
+    return result
@@ -0,0 +1,38 @@
+"""Run independent WHOOP API requests concurrently."""
+
+import asyncio
+from collections.abc import Awaitable, Coroutine
+from typing import Any, TypeVar
+
+from app.services.whoop_client import WhoopAPIError
+
+T = TypeVar("T")
+
+
+async def optional(request: Awaitable[T]) -> T | None:
+    """Await a request, returning None if the resource doesn't exist (404)."""
+    try:
+        return await request
+    except WhoopAPIError as e:
+        if e.status_code != 404:
+            raise
+        return None
+
+
+async def fan_out(*requests: Coroutine[Any, Any, Any] | None) -> list[Any]:
+    """Await requests concurrently and return their results in order.
+
+    A None in place of a request yields None, so optional branches can be
+    skipped inline. If any request fails, the others are cancelled and the
+    first error is raised as-is.
+    """
+    tasks: list[asyncio.Task | None] = []
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(request) if request is not None else None
+                for request in requests
+            ]
+    except BaseExceptionGroup as eg:
+        raise eg.exceptions[0] from None
+    return [task.result() if task is not None else None for task in tasks]
@@ -0,0 +1,240 @@
+"""In-process counters and latency histograms, rendered in OpenMetrics text format.
+
+Tool calls are measured by `MetricsMiddleware`, upstream requests, retries,
+token refreshes and pagination by `WhoopClient`, and validation and
+serialization by the collection helpers. The registry is exposed at `/metrics`
+when serving over HTTP and as the `whoop://metrics` resource over any transport.
+"""
+
+import math
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PAGE_BUCKETS = (1, 2, 4, 8, 16, 24, 40)
+RECORD_BUCKETS = (0, 1, 10, 25, 50, 100, 250, 500, 1000)
+
+# Record ids in paths are replaced so each endpoint is one label value
+_ID_SEGMENT = re.compile(r"/(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27})(?=/|$)")
+
+
+def endpoint_label(path: str) -> str:
+    """Path with record ids replaced by {id}, e.g. /v2/cycle/{id}/sleep."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.values.items():
+            yield f"{self.name}_total{_labels(self.labels, key)} {_number(value)}"
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {**dict(zip(self.labels, key, strict=True)), "value": value}
+            for key, value in self.values.items()
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = (*buckets, math.inf)
+        # label values -> [per-bucket counts..., sum, count]
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        state[-2] += value
+        state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[str]:
+        for key, state in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state[: len(self.buckets)], strict=True):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, key)} {_number(state[-2])}"
+            yield f"{self.name}_count{_labels(self.labels, key)} {state[-1]}"
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {
+                **dict(zip(self.labels, key, strict=True)),
+                "count": state[-1],
+                "sum": round(state[-2], 6),
+                "mean": round(state[-2] / state[-1], 6) if state[-1] else None,
+            }
+            for key, state in self.values.items()
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = self.metrics[name] = Counter(name, help, labels)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = self.metrics[name] = Histogram(name, help, labels, buckets)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in OpenMetrics text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        """Counts, sums and means per label combination, for JSON consumers."""
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            metric.values.clear()
+
+
+registry = Registry()
+
+TOOL_CALLS = registry.counter(
+    "whoop_tool_calls", "MCP tool calls by outcome (ok, api_error, exception)", ("tool", "outcome")
+)
+TOOL_DURATION = registry.histogram(
+    "whoop_tool_duration_seconds", "MCP tool call latency", ("tool",)
+)
+UPSTREAM_REQUESTS = registry.counter(
+    "whoop_upstream_requests",
+    "HTTP requests sent to the WHOOP API, including retried attempts",
+    ("method", "endpoint", "status"),
+)
+UPSTREAM_DURATION = registry.histogram(
+    "whoop_upstream_request_duration_seconds",
+    "Latency of each HTTP attempt to the WHOOP API",
+    ("method", "endpoint", "status"),
+)
+UPSTREAM_RETRIES = registry.counter(
+    "whoop_upstream_retries",
+    "Retried WHOOP API attempts by reason (429, 5xx, transport)",
+    ("endpoint", "reason"),
+)
+TOKEN_REFRESHES = registry.counter(
+    "whoop_token_refreshes", "Access token refresh attempts", ("outcome",)
+)
+PAGINATION_PAGES = registry.histogram(
+    "whoop_pagination_pages",
+    "Pages requested per paginated query (per shard when sharded)",
+    ("endpoint",),
+    PAGE_BUCKETS,
+)
+PAGINATION_RECORDS = registry.histogram(
+    "whoop_pagination_records",
+    "Records returned per paginated query",
+    ("endpoint",),
+    RECORD_BUCKETS,
+)
+STAGE_DURATION = registry.histogram(
+    "whoop_stage_duration_seconds",
+    "Time spent validating pages and serializing records",
+    ("stage", "model"),
+)
+
+
+class MetricsMiddleware(Middleware):
+    """Count and time every tool call.
+
+    Tools report WHOOP failures as `{"error": ...}` results rather than raising,
+    so those are counted as api_error.
+    """
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        tool = context.message.name
+        outcome = "exception"
+        started = time.perf_counter()
+        try:
+            result = await call_next(context)
+            content = getattr(result, "structured_content", None)
+            outcome = "api_error" if isinstance(content, dict) and "error" in content else "ok"
+            return result
+        finally:
+            TOOL_DURATION.observe(time.perf_counter() - started, tool=tool)
+            TOOL_CALLS.inc(tool=tool, outcome=outcome)
@@ -0,0 +1,184 @@
+"""On-demand profiling of individual tool calls, switched on through settings.
+
+WHOOP_PROFILE_MODE selects deterministic profiling ("cprofile") or stack
+sampling ("sample") for the tools in WHOOP_PROFILE_TOOLS, at
+WHOOP_PROFILE_SAMPLE_RATE. Each profiled call slower than
+WHOOP_PROFILE_MIN_SECONDS leaves files in WHOOP_PROFILE_DIR named
+`<time>-<tool>-<ms>ms`:
+
+- `.prof`: cProfile stats (cprofile mode), for pstats or snakeviz
+- `.folded`: folded stacks (`frame;frame;frame count`), for flamegraph.pl or
+  speedscope; cProfile stacks are reconstructed from its caller graph, so
+  they are approximate, while sampled stacks are exact
+
+Both profilers observe the event loop thread, so calls running concurrently
+with a profiled one show up in its profile. Only one call is profiled at a time.
+"""
+
+import cProfile
+import logging
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+from app.config import settings
+
+# Folded stacks from cProfile stop expanding at this depth
+MAX_DEPTH = 64
+
+logger = logging.getLogger(__name__)
+
+
+def _label(filename: str, lineno: int, name: str) -> str:
+    if filename == "~":
+        # cProfile's key for builtins, e.g. <method 'append' of 'list' objects>
+        return name
+    return f"{name} ({Path(filename).name}:{lineno})"
+
+
+class StackSampler:
+    """Sample one thread's Python stack every `interval` seconds from a background thread."""
+
+    def __init__(self, interval: float, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(_label(code.co_filename, code.co_firstlineno, code.co_qualname))
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def folded_from_stats(stats: pstats.Stats) -> str:
+    """Approximate folded stacks (weights in microseconds) from cProfile's caller graph.
+
+    Starting at functions nobody called, each function's time along a path is
+    split between its own time and its callees in proportion to the time
+    recorded on each caller -> callee edge. Recursive calls are not expanded.
+
+    Frames already running when the profiler was enabled (such as the event
+    loop's `_run_once`) have no recorded caller, so they are roots too, and their
+    own time shows up as single-frame stacks. They are kept because everything
+    the tool call ran is reached through them.
+    """
+    callees: dict[tuple, dict[tuple, float]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    lines: Counter[str] = Counter()
+
+    def walk(func: tuple, path: list[str], seen: set, elapsed: float) -> None:
+        _, _, own, total, _ = stats.stats[func]
+        path = [*path, _label(*func)]
+        if total > 0:
+            weight = round(elapsed * own / total * 1e6)
+            if weight:
+                lines[";".join(path)] += weight
+        if len(path) >= MAX_DEPTH or total <= 0:
+            return
+        for callee, edge_total in callees.get(func, {}).items():
+            if callee not in seen:
+                walk(callee, path, seen | {callee}, elapsed * edge_total / total)
+
+    for root in roots:
+        walk(root, [], {root}, stats.stats[root][3])
+    return "".join(f"{stack} {weight}\n" for stack, weight in lines.most_common())
+
+
+def _selected_tools() -> set[str]:
+    return {name.strip() for name in settings.whoop_profile_tools.split(",") if name.strip()}
+
+
+class ProfilingMiddleware(Middleware):
+    """Profile sampled calls to the configured tools and write the dumps to disk."""
+
+    def __init__(self):
+        self._active = False
+
+    def _should_profile(self, tool: str) -> bool:
+        if settings.whoop_profile_mode == "off" or self._active:
+            return False
+        tools = _selected_tools()
+        if tools and tool not in tools:
+            return False
+        return random.random() < settings.whoop_profile_sample_rate
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        tool = context.message.name
+        if not self._should_profile(tool):
+            return await call_next(context)
+
+        mode = settings.whoop_profile_mode
+        profiler = sampler = None
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            sampler = StackSampler(settings.whoop_profile_interval)
+            sampler.start()
+        self._active = True
+        started = time.perf_counter()
+        try:
+            return await call_next(context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+            else:
+                sampler.stop()
+            self._active = False
+            if elapsed >= settings.whoop_profile_min_seconds:
+                try:
+                    self._write(tool, elapsed, profiler, sampler)
+                except OSError as e:
+                    logger.warning(f"Could not write profile for {tool}: {e}")
+
+    def _write(
+        self,
+        tool: str,
+        elapsed: float,
+        profiler: cProfile.Profile | None,
+        sampler: StackSampler | None,
+    ) -> Path:
+        directory = settings.whoop_profile_dir
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        base = directory / f"{stamp}-{tool}-{elapsed * 1000:.0f}ms"
+        if profiler is not None:
+            profiler.dump_stats(base.with_suffix(".prof"))
+            folded = folded_from_stats(pstats.Stats(profiler))
+        else:
+            folded = sampler.folded()
+        base.with_suffix(".folded").write_text(folded)
+        logger.info(f"Profiled {tool} ({elapsed:.3f}s) to {base}.*")
+        return base
@@ -0,0 +1,110 @@
+"""Client-side rate limiting and retry backoff for the WHOOP API.
+
+WHOOP allows 100 requests per minute and 10,000 per day per app. Requests wait
+for a token from both buckets, and a 429 or an exhausted rate-limit header
+pauses all requests until the server says the window resets.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable, Mapping
+from email.utils import parsedate_to_datetime
+
+from app.config import settings
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> float:
+        """Take a token if available. Returns 0, or the seconds until one will be."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.buckets = [
+            TokenBucket(
+                settings.whoop_rate_limit_per_minute / 60,
+                settings.whoop_rate_limit_burst,
+                clock,
+            ),
+            TokenBucket(
+                settings.whoop_rate_limit_per_day / 86400,
+                settings.whoop_rate_limit_per_day,
+                clock,
+            ),
+        ]
+        self._paused_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent under every bucket and any server pause."""
+        while True:
+            wait = self._paused_until - self._clock()
+            if wait <= 0:
+                waits = [bucket.try_take() for bucket in self.buckets]
+                wait = max(waits)
+                if wait <= 0:
+                    return
+                # Give back tokens taken from buckets that weren't the bottleneck
+                for bucket, bucket_wait in zip(self.buckets, waits, strict=True):
+                    if bucket_wait <= 0:
+                        bucket.tokens += 1
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for the given number of seconds."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Pause until the window resets when the server reports no requests remaining."""
+        remaining = _first_number(headers.get("x-ratelimit-remaining"))
+        reset = _first_number(headers.get("x-ratelimit-reset"))
+        if remaining is not None and remaining <= 0 and reset is not None:
+            self.pause(reset)
+
+
+def _first_number(value: str | None) -> float | None:
+    # Rate-limit headers may list several windows, e.g. "100, 10000;window=86400"
+    if not value:
+        return None
+    try:
+        return float(value.split(",")[0].split(";")[0].strip())
+    except ValueError:
+        return None
+
+
+def retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds the server asked us to wait, from Retry-After or X-RateLimit-Reset."""
+    value = headers.get("retry-after")
+    if value:
+        seconds = _first_number(value)
+        if seconds is not None:
+            return max(seconds, 0.0)
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+    return _first_number(headers.get("x-ratelimit-reset"))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Capped exponential backoff with full jitter for the given retry attempt (0-based)."""
+    ceiling = min(settings.whoop_retry_backoff_max, settings.whoop_retry_backoff_base * 2**attempt)
+    return random.uniform(0, ceiling)
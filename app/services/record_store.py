@@ -0,0 +1,225 @@
+"""Local SQLite store for WHOOP collection records.
+
+Collection queries with a `start` are served from the store. Each query first
+syncs incrementally: history older than anything stored is backfilled once, and
+only a short trailing window (plus any record not yet final) is re-fetched to
+pick up new records and ones whose `updated_at` moved.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.services.whoop_client import MAX_LIMIT, WhoopClient
+from app.utils.timezone import format_iso_datetime, parse_iso_datetime
+
+# Collection endpoint -> record kind stored in the `kind` column
+COLLECTIONS = {
+    "/v2/cycle": "cycle",
+    "/v2/activity/sleep": "sleep",
+    "/v2/recovery": "recovery",
+    "/v2/activity/workout": "workout",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    user_id INTEGER,
+    start REAL,
+    end REAL,
+    updated_at REAL,
+    final INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS records_kind_start ON records (kind, start);
+CREATE INDEX IF NOT EXISTS records_kind_end ON records (kind, end);
+CREATE INDEX IF NOT EXISTS records_kind_user ON records (kind, user_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    synced_from REAL NOT NULL,
+    synced_to REAL NOT NULL
+);
+"""
+
+UPSERT = """
+INSERT INTO records (kind, id, user_id, start, end, updated_at, final, payload)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (kind, id) DO UPDATE SET
+    user_id = excluded.user_id,
+    start = excluded.start,
+    end = excluded.end,
+    updated_at = excluded.updated_at,
+    final = excluded.final,
+    payload = excluded.payload
+WHERE excluded.updated_at IS NULL
+    OR records.updated_at IS NULL
+    OR excluded.updated_at >= records.updated_at
+"""
+
+
+def _timestamp(value: str | None) -> float | None:
+    return parse_iso_datetime(value).timestamp() if value else None
+
+
+def _record_row(kind: str, record: dict) -> tuple:
+    # Recoveries have no start/end of their own; created_at places them in time
+    start = record.get("created_at") if kind == "recovery" else record.get("start")
+    final = record.get("score_state") == "SCORED" and (
+        kind == "recovery" or record.get("end") is not None
+    )
+    return (
+        kind,
+        str(record["cycle_id"] if kind == "recovery" else record["id"]),
+        record.get("user_id"),
+        _timestamp(start),
+        _timestamp(record.get("end")),
+        _timestamp(record.get("updated_at")),
+        int(final),
+        json.dumps(record),
+    )
+
+
+class RecordStore:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._sync_locks: dict[str, asyncio.Lock] = {}
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._db.close()
+
+    async def get_paginated(
+        self, client: WhoopClient, path: str, params: dict | None, limit: int
+    ) -> dict[str, Any]:
+        """Serve a collection query from the store, syncing it first.
+
+        Queries without a `start` have no bounded window to check coverage
+        against, so they go to the API; their records are still stored.
+        """
+        kind = COLLECTIONS[path]
+        limit = min(limit, MAX_LIMIT)
+        params = params or {}
+        start = _timestamp(params.get("start"))
+        end = _timestamp(params.get("end"))
+
+        if start is None:
+            response = await client.get_paginated(path, params, limit)
+            await asyncio.to_thread(self._upsert, kind, response["records"])
+            return response
+
+        lock = self._sync_locks.setdefault(kind, asyncio.Lock())
+        async with lock:
+            await self._sync(client, kind, path, start, end)
+        records = await asyncio.to_thread(self._query, kind, start, end, limit + 1)
+        return {"records": records[:limit], "has_more": len(records) > limit, "next_token": None}
+
+    async def get_all(self, client: WhoopClient, path: str, params: dict | None) -> list[dict]:
+        """Every record matching params, served from the store like `get_paginated`."""
+        kind = COLLECTIONS[path]
+        params = params or {}
+        start = _timestamp(params.get("start"))
+        end = _timestamp(params.get("end"))
+
+        if start is None:
+            records = await client.get_all(path, params)
+            await asyncio.to_thread(self._upsert, kind, records)
+            return records
+
+        lock = self._sync_locks.setdefault(kind, asyncio.Lock())
+        async with lock:
+            await self._sync(client, kind, path, start, end)
+        return await asyncio.to_thread(self._query, kind, start, end)
+
+    async def _sync(
+        self, client: WhoopClient, kind: str, path: str, start: float, end: float | None
+    ) -> None:
+        now = time.time()
+        state = await asyncio.to_thread(self._get_state, kind)
+        if state is None:
+            await self._fetch(client, kind, path, start, None)
+            await asyncio.to_thread(self._set_state, kind, start, now)
+            return
+
+        synced_from, synced_to = state
+        if start < synced_from:
+            await self._fetch(client, kind, path, start, synced_from)
+            synced_from = start
+
+        lookback = settings.whoop_record_store_lookback_hours * 3600
+        refresh_from = synced_to - lookback
+        pending = await asyncio.to_thread(self._oldest_pending_start, kind)
+        if pending is not None:
+            refresh_from = min(refresh_from, pending)
+
+        recently_synced = now - synced_to < settings.whoop_record_store_sync_interval
+        settled = end is not None and end <= refresh_from
+        if not (recently_synced or settled):
+            await self._fetch(client, kind, path, refresh_from, None)
+            synced_to = now
+        await asyncio.to_thread(self._set_state, kind, synced_from, synced_to)
+
+    async def _fetch(
+        self, client: WhoopClient, kind: str, path: str, start: float, end: float | None
+    ) -> None:
+        params = {"start": format_iso_datetime(datetime.fromtimestamp(start, UTC))}
+        if end is not None:
+            params["end"] = format_iso_datetime(datetime.fromtimestamp(end, UTC))
+        records = await client.get_all(path, params)
+        await asyncio.to_thread(self._upsert, kind, records)
+
+    def _upsert(self, kind: str, records: list[dict]) -> None:
+        rows = [_record_row(kind, record) for record in records]
+        with self._db_lock, self._db:
+            self._db.executemany(UPSERT, rows)
+
+    def _query(
+        self, kind: str, start: float, end: float | None, limit: int | None = None
+    ) -> list[dict]:
+        sql = "SELECT payload FROM records WHERE kind = ? AND start >= ?"
+        args: list[Any] = [kind, start]
+        if end is not None:
+            sql += " AND start < ?"
+            args.append(end)
+        sql += " ORDER BY start DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._db_lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def _oldest_pending_start(self, kind: str) -> float | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT MIN(start) FROM records WHERE kind = ? AND final = 0", (kind,)
+            ).fetchone()
+        return row[0]
+
+    def _get_state(self, kind: str) -> tuple[float, float] | None:
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT synced_from, synced_to FROM sync_state WHERE kind = ?", (kind,)
+            ).fetchone()
+
+    def _set_state(self, kind: str, synced_from: float, synced_to: float) -> None:
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state (kind, synced_from, synced_to) VALUES (?, ?, ?)",
+                (kind, synced_from, synced_to),
+            )
+
+
+record_store = (
+    RecordStore(settings.whoop_record_store_path) if settings.whoop_record_store_path else None
+)
@@ -0,0 +1,50 @@
+"""Local persistence for OAuth tokens.
+
+Refreshed tokens are written to a JSON file that `Settings` reads at startup,
+so a restarted server picks up the latest token instead of the one in `.env`.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def save_tokens(
+    path: Path,
+    access_token: str,
+    refresh_token: str,
+    expires_at: float | None,
+) -> None:
+    """Atomically write tokens to the token store.
+
+    The file is written to a temporary sibling and renamed into place, so a crash
+    mid-write never leaves a truncated store behind.
+
+    Args:
+        path: Token store file
+        access_token: Current access token
+        refresh_token: Current refresh token
+        expires_at: Unix timestamp when the access token expires, if known
+    """
+    data = {
+        "whoop_access_token": access_token,
+        "whoop_refresh_token": refresh_token,
+        "whoop_token_expires_at": expires_at,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, 0o600)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    logger.debug(f"Saved tokens to {path}")
@@ -0,0 +1,188 @@
+"""Lightweight OpenTelemetry-style tracing for tool calls and WHOOP requests.
+
+Spans cover each tool call, each paginated query and page, each HTTP attempt,
+page validation (which also localizes timestamps) and record serialization,
+with record counts and byte sizes as attributes. Finished spans go to stderr
+or are appended as JSON lines to a file, so tracing works offline.
+
+When WHOOP_TRACING is "off", `span()` returns a shared no-op span, so
+instrumented code pays one function call per span and nothing else.
+"""
+
+import json
+import random
+import sys
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Protocol
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+from app.config import settings
+
+
+class Exporter(Protocol):
+    def export(self, span: dict[str, Any]) -> None: ...
+
+
+class ConsoleExporter:
+    """One line per finished span on stderr (stdout carries the stdio MCP transport)."""
+
+    def export(self, span: dict[str, Any]) -> None:
+        attributes = " ".join(f"{k}={v}" for k, v in span["attributes"].items())
+        print(
+            f"[trace {span['trace_id'][:8]}] {span['name']} "
+            f"{span['duration_ms']:.2f}ms {span['status']} {attributes}",
+            file=sys.stderr,
+        )
+
+
+class FileExporter:
+    """Finished spans appended to `path` as JSON lines.
+
+    The file is opened per span, so nothing is left open at shutdown and the
+    file can be rotated or deleted while the server runs.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+
+    def export(self, span: dict[str, Any]) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(span, default=str) + "\n")
+
+
+_exporter: Exporter | None = None
+_current: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes; ends (and is exported) on leaving the `with` block.
+
+    Entering makes it the current span, so spans started inside it (including in
+    tasks created inside it) become its children.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_ns",
+        "status",
+        "_token",
+    )
+
+    def __init__(self, name: str, parent: "Span | None", attributes: dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.status = "OK"
+        self._token = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: BaseException | None = None) -> None:
+        end_ns = time.time_ns()
+        if error is not None:
+            self.status = "ERROR"
+            self.attributes["error"] = repr(error)
+        exporter = _exporter
+        if exporter is None:
+            return
+        exporter.export(
+            {
+                "name": self.name,
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_span_id": self.parent_id,
+                "start_time_unix_nano": self.start_ns,
+                "end_time_unix_nano": end_ns,
+                "duration_ms": round((end_ns - self.start_ns) / 1e6, 3),
+                "status": self.status,
+                "attributes": self.attributes,
+            }
+        )
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        self.end(exc)
+
+
+class _NoopSpan:
+    """Stands in for every span while tracing is off."""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def end(self, error: BaseException | None = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+    def __bool__(self) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, parent: Span | _NoopSpan | None = None, **attributes: Any) -> Span | _NoopSpan:
+    """Start a span, child of `parent` or else of the current span.
+
+    Use as a context manager to make it current for the block, or call `end()`
+    yourself for spans that outlive one block (e.g. across an async generator's
+    yields, where changing the current span would leak into the consumer).
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    return Span(name, parent or _current.get(), attributes)
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def configure(mode: str, path: Path | None = None) -> None:
+    """Select the exporter: "off", "console", or "file" (JSON lines at `path`)."""
+    global _exporter
+    if mode == "console":
+        _exporter = ConsoleExporter()
+    elif mode == "file":
+        _exporter = FileExporter(path or settings.whoop_trace_file)
+    else:
+        _exporter = None
+
+
+class TracingMiddleware(Middleware):
+    """Open a root span for every tool call, with the size of the serialized result."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        if _exporter is None:
+            return await call_next(context)
+        tool = context.message.name
+        with span(f"tool/{tool}", tool=tool) as root:
+            result = await call_next(context)
+            text = [c.text for c in getattr(result, "content", ()) if hasattr(c, "text")]
+            root.set(response_bytes=sum(len(t) for t in text))
+            return result
+
+
+configure(settings.whoop_tracing, settings.whoop_trace_file)
@@ -1,12 +1,29 @@
+import asyncio
+import copy
+import importlib.util
 import logging
+import sys
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Any
 
 import httpx
+from pydantic import BaseModel
 
-from app.config import settings
+from app.config import TOKEN_STORE_FILE, settings
+from app.schemas.page import page_adapter
+from app.services import metrics, tracing
+from app.services.cache import ResponseCache, cache_ttl
+from app.services.rate_limit import RateLimiter, backoff_delay, retry_after
+from app.services.token_store import save_tokens
+from app.utils.timezone import format_iso_datetime, parse_iso_datetime
 
 MAX_LIMIT = 1000
 DEFAULT_LIMIT = 25
+PAGE_SIZE = 25
+MIN_SHARD_SPAN = timedelta(days=1)
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +36,30 @@ class WhoopAPIError(Exception):
 
 
 class WhoopClient:
-    def __init__(self):
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        token_store: Path | None = TOKEN_STORE_FILE,
+    ):
         self.base_url = settings.whoop_api_base_url
         self.token_url = settings.whoop_token_url
         self.access_token = settings.whoop_access_token
         self.refresh_token = settings.whoop_refresh_token
         self.client_id = settings.whoop_client_id
         self.client_secret = settings.whoop_client_secret
+        self.expires_at = settings.whoop_token_expires_at
+        self.transport = transport
+        self.token_store = token_store
+        self._http: httpx.AsyncClient | None = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self.cache = ResponseCache(settings.whoop_cache_max_entries)
+        self.rate_limiter = RateLimiter()
+        self._in_flight: dict[str, tuple[asyncio.Task, list[int]]] = {}
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return self._get_headers()
 
     def _get_headers(self) -> dict[str, str]:
         return {
@@ -33,95 +67,519 @@ class WhoopClient:
             "Content-Type": "application/json",
         }
 
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._http is None or self._http.is_closed:
+            http2 = settings.whoop_http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed")
+                http2 = False
+            self._http = httpx.AsyncClient(
+                transport=self.transport,
+                http2=http2,
+                timeout=settings.whoop_request_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.whoop_max_connections,
+                    max_keepalive_connections=settings.whoop_max_keepalive_connections,
+                    keepalive_expiry=settings.whoop_keepalive_expiry,
+                ),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Stop background token refresh and release pooled connections."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _can_refresh(self) -> bool:
+        return all([self.refresh_token, self.client_id, self.client_secret])
+
     async def _refresh_access_token(self) -> bool:
         """Refresh the access token using the refresh token. Returns True if successful."""
-        if not all([self.refresh_token, self.client_id, self.client_secret]):
+        if not self._can_refresh():
             logger.warning("Cannot refresh token: missing refresh_token, client_id, or client_secret")
+            metrics.TOKEN_REFRESHES.inc(outcome="unavailable")
             return False
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.token_url,
-                    data={
-                        "grant_type": "refresh_token",
-                        "refresh_token": self.refresh_token,
-                        "client_id": self.client_id,
-                        "client_secret": self.client_secret,
-                    },
-                    timeout=30.0,
-                )
-                if response.status_code != 200:
-                    logger.error(f"Token refresh failed: {response.status_code} - {response.text}")
-                    return False
-
-                tokens = response.json()
-                self.access_token = tokens["access_token"]
-                if "refresh_token" in tokens:
-                    self.refresh_token = tokens["refresh_token"]
-                logger.info("Successfully refreshed access token")
-                return True
+            response = await self._get_http_client().post(
+                self.token_url,
+                data={
+                    "grant_type": "refresh_token",
+                    "refresh_token": self.refresh_token,
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                },
+            )
+            if response.status_code != 200:
+                logger.error(f"Token refresh failed: {response.status_code} - {response.text}")
+                metrics.TOKEN_REFRESHES.inc(outcome="failed")
+                return False
+
+            tokens = response.json()
+            self.access_token = tokens["access_token"]
+            if "refresh_token" in tokens:
+                self.refresh_token = tokens["refresh_token"]
+            expires_in = tokens.get("expires_in")
+            self.expires_at = time.time() + expires_in if expires_in else None
+            logger.info("Successfully refreshed access token")
         except Exception as e:
             logger.error(f"Token refresh error: {e}")
+            metrics.TOKEN_REFRESHES.inc(outcome="failed")
             return False
 
+        metrics.TOKEN_REFRESHES.inc(outcome="success")
+        if self.token_store is not None:
+            try:
+                save_tokens(
+                    self.token_store, self.access_token, self.refresh_token, self.expires_at
+                )
+            except OSError as e:
+                logger.warning(f"Could not persist refreshed tokens: {e}")
+        return True
+
+    async def _refresh_token_once(self, stale_token: str) -> bool:
+        """Refresh once on behalf of every caller holding the same stale token.
+
+        The first caller performs the refresh while holding the lock; callers queued
+        behind it see that the token has already changed and reuse the new one.
+        """
+        async with self._refresh_lock:
+            if self.access_token != stale_token:
+                return True
+            return await self._refresh_access_token()
+
+    def _token_expiring(self) -> bool:
+        if self.expires_at is None:
+            return False
+        return time.time() >= self.expires_at - settings.whoop_token_refresh_margin
+
+    async def _ensure_fresh_token(self) -> None:
+        """Refresh before sending if the token is about to expire."""
+        self.start_token_refresh()
+        if self._token_expiring() and self._can_refresh():
+            refreshed = await self._refresh_token_once(self.access_token)
+            if not refreshed or self._token_expiring():
+                # Fall back to refreshing on 401 instead of retrying on every request
+                self.expires_at = None
+
+    def start_token_refresh(self) -> None:
+        """Start the background task that refreshes the token ahead of expiry.
+
+        Must be called from a running event loop. Does nothing if the expiry is
+        unknown, refresh credentials are missing, or the task is already running.
+        """
+        if self.expires_at is None or not self._can_refresh():
+            return
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._refresh_task = loop.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while self.expires_at is not None:
+            stale_token = self.access_token
+            delay = self.expires_at - settings.whoop_token_refresh_margin - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.access_token != stale_token:
+                continue
+            refreshed = await self._refresh_token_once(stale_token)
+            if not refreshed or self._token_expiring():
+                logger.warning("Background token refresh failed; will refresh on 401")
+                self.expires_at = None
+
+    async def _send(
+        self, method: str, path: str, params: dict | None
+    ) -> tuple[httpx.Response, str]:
+        """Send a request under the rate limiter, retrying 429s, 5xx and connection errors.
+
+        Waits for Retry-After (or the rate-limit reset) when the server gives one,
+        otherwise backs off exponentially with jitter. Returns the final response
+        and the access token it was sent with.
+
+        Every attempt is counted and timed (excluding rate-limiter waits) by
+        endpoint and status; transport failures have status "error".
+        """
+        endpoint = metrics.endpoint_label(path)
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            sent_token = self.access_token
+            started = time.perf_counter()
+            span = tracing.span("whoop.http", method=method, endpoint=endpoint, attempt=attempt)
+            try:
+                with span:
+                    response = await self._get_http_client().request(
+                        method,
+                        f"{self.base_url}{path}",
+                        headers=self._get_headers(),
+                        params=params,
+                    )
+                    span.set(status_code=response.status_code, bytes=len(response.content))
+            except httpx.TransportError as e:
+                _observe_attempt(method, endpoint, "error", started)
+                if attempt >= settings.whoop_max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{method} {path} failed ({e!r}); retrying in {delay:.2f}s")
+                metrics.UPSTREAM_RETRIES.inc(endpoint=endpoint, reason="transport")
+            else:
+                status = response.status_code
+                _observe_attempt(method, endpoint, status, started)
+                self.rate_limiter.observe(response.headers)
+                if status != 429 and status < 500:
+                    return response, sent_token
+                if attempt >= settings.whoop_max_retries:
+                    return response, sent_token
+                delay = retry_after(response.headers)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                elif delay > settings.whoop_retry_backoff_max:
+                    # Not worth holding the caller this long; surface the error instead
+                    return response, sent_token
+                if status == 429:
+                    self.rate_limiter.pause(delay)
+                logger.warning(f"{method} {path} returned {status}; retrying in {delay:.2f}s")
+                metrics.UPSTREAM_RETRIES.inc(
+                    endpoint=endpoint, reason="429" if status == 429 else "5xx"
+                )
+            await asyncio.sleep(delay)
+            attempt += 1
+
     async def _request(
-        self, method: str, path: str, params: dict | None = None, _retry: bool = True
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        model: type[BaseModel] | None = None,
+        _retry: bool = True,
     ) -> dict:
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method,
-                f"{self.base_url}{path}",
-                headers=self._get_headers(),
-                params=params,
-                timeout=30.0,
-            )
-            if response.status_code == 401:
-                if _retry and await self._refresh_access_token():
-                    return await self._request(method, path, params, _retry=False)
-                raise WhoopAPIError(401, "Invalid or expired access token")
-            if response.status_code == 404:
-                raise WhoopAPIError(404, f"Resource not found: {path}")
-            if response.status_code == 429:
-                raise WhoopAPIError(429, "Rate limit exceeded. Please retry later.")
-            if response.status_code >= 500:
-                raise WhoopAPIError(response.status_code, "WHOOP server error. Please retry.")
-            response.raise_for_status()
-            return response.json()
+        """Send a request and decode the JSON body.
+
+        With `model`, the body is a collection page decoded straight from the raw
+        bytes into a `Page` of that model in a single validation pass.
+        """
+        await self._ensure_fresh_token()
+        response, sent_token = await self._send(method, path, params)
+        if response.status_code == 401:
+            if _retry and await self._refresh_token_once(sent_token):
+                return await self._request(method, path, params, model, _retry=False)
+            raise WhoopAPIError(401, "Invalid or expired access token")
+        if response.status_code == 404:
+            raise WhoopAPIError(404, f"Resource not found: {path}")
+        if response.status_code == 429:
+            raise WhoopAPIError(429, "Rate limit exceeded. Please retry later.")
+        if response.status_code >= 500:
+            raise WhoopAPIError(response.status_code, "WHOOP server error. Please retry.")
+        response.raise_for_status()
+        if model is not None:
+            with (
+                metrics.STAGE_DURATION.time(stage="validate", model=model.__name__),
+                tracing.span("whoop.validate", model=model.__name__) as span,
+            ):
+                page = page_adapter(model).validate_json(response.content)
+                span.set(records=len(page["records"]), bytes=len(response.content))
+                return page
+        return response.json()
 
     async def get(self, path: str, params: dict | None = None) -> dict:
-        return await self._request("GET", path, params)
+        """GET a single resource, served from the response cache when possible."""
+        key = _request_key(path, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self._get_shared(path, params)
+        self.cache.set(key, response, cache_ttl(path, response))
+        return response
+
+    async def _get_shared(
+        self, path: str, params: dict | None = None, model: type[BaseModel] | None = None
+    ) -> dict:
+        """GET through one upstream request shared by all identical concurrent callers.
+
+        The request runs as its own task, so a caller being cancelled doesn't fail
+        the others. When several callers share a response, each gets its own copy.
+        """
+        key = _request_key(path, params)
+        if model is not None:
+            key = f"{key}#{model.__qualname__}"
+        entry = self._in_flight.get(key)
+        if entry is None:
+
+            async def fetch() -> dict:
+                try:
+                    return await self._request("GET", path, params, model)
+                finally:
+                    del self._in_flight[key]
+
+            task = asyncio.ensure_future(fetch())
+            # Mark the exception retrieved even if every caller was cancelled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            entry = self._in_flight[key] = (task, [0])
+
+        task, waiters = entry
+        waiters[0] += 1
+        response = await asyncio.shield(task)
+        return copy.deepcopy(response) if waiters[0] > 1 else response
 
     async def get_paginated(
         self,
         path: str,
         params: dict | None = None,
         limit: int = DEFAULT_LIMIT,
+        shards: int | None = None,
     ) -> dict[str, Any]:
-        """Fetch paginated results up to limit (max 1000)."""
+        """Fetch paginated results up to limit (max 1000).
+
+        With more than one shard (default: WHOOP_PAGINATION_SHARDS) and a `start`
+        param, the start/end window is split into sub-ranges that are paginated
+        concurrently and merged newest first. Sharded results never carry a
+        next_token, since no single cursor spans all sub-ranges.
+        """
+        return await collect_pages(self.iter_pages(path, params, limit, shards))
+
+    async def iter_pages(
+        self,
+        path: str,
+        params: dict | None = None,
+        limit: int = DEFAULT_LIMIT,
+        shards: int | None = None,
+        model: type[BaseModel] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield pages of records as they arrive, up to limit (max 1000) in total.
+
+        Each page has `records`, plus `has_more` and `next_token` describing the
+        collection after that page; the last page's values are the final ones.
+        With `model`, records are validated instances decoded from the raw page
+        bytes instead of dicts. See get_paginated for sharding.
+        """
         limit = min(limit, MAX_LIMIT)
         params = params or {}
-        all_records: list[dict] = []
+        if shards is None:
+            shards = settings.whoop_pagination_shards
+
+        windows = None
+        if shards > 1 and limit > PAGE_SIZE:
+            windows = _split_window(params.get("start"), params.get("end"), shards)
+        endpoint = metrics.endpoint_label(path)
+        # Not entered: a current span set here would leak to the consumer between yields
+        query = tracing.span("whoop.paginate", endpoint=endpoint, limit=limit)
+        pages = (
+            self._iter_sharded(path, params, limit, windows, model, query)
+            if windows
+            else self._iter_serial(path, params, limit, model, query)
+        )
+        records = 0
+        error = None
+        try:
+            async for page in pages:
+                records += len(page["records"])
+                yield page
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            metrics.PAGINATION_RECORDS.observe(records, endpoint=endpoint)
+            query.set(records=records, shards=len(windows) if windows else 1)
+            query.end(error)
+
+    async def iter_records(
+        self,
+        path: str,
+        params: dict | None = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> AsyncIterator[dict]:
+        """Yield records one at a time, fetching pages as needed."""
+        async for page in self.iter_pages(path, params, limit):
+            for record in page["records"]:
+                yield record
+
+    async def get_all(self, path: str, params: dict | None = None) -> list[dict]:
+        """Fetch every record matching params, following next_token to the end."""
+        response = await collect_pages(self._iter_serial(path, params or {}, sys.maxsize))
+        return response["records"]
+
+    async def _iter_serial(
+        self,
+        path: str,
+        params: dict,
+        limit: int,
+        model: type[BaseModel] | None = None,
+        trace: tracing.Span | None = None,
+        proceed: Callable[[int], Awaitable[bool]] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Follow next_token one page at a time until limit records are fetched.
+
+        Each page request is traced as a child of `trace` (or the current span).
+        With `proceed`, it is awaited with the records fetched so far before each
+        further page; if it returns False, pagination stops and the last page
+        reports has_more.
+        """
+        fetched = pages = 0
         next_token: str | None = None
 
-        while len(all_records) < limit:
-            page_params = {**params, "limit": min(25, limit - len(all_records))}
-            if next_token:
-                page_params["nextToken"] = next_token
+        try:
+            while fetched < limit:
+                page_params = {**params, "limit": min(PAGE_SIZE, limit - fetched)}
+                if next_token:
+                    page_params["nextToken"] = next_token
 
-            data = await self.get(path, page_params)
-            records = data.get("records", [])
-            all_records.extend(records)
+                with tracing.span(
+                    "whoop.page", trace, endpoint=metrics.endpoint_label(path), page=pages
+                ) as span:
+                    data = await self._get_shared(path, page_params, model)
+                    records = data.get("records", [])[: limit - fetched]
+                    span.set(records=len(records))
+                pages += 1
+                fetched += len(records)
 
-            next_token = data.get("next_token")
-            if not next_token or not records:
-                break
+                next_token = data.get("next_token")
+                more = bool(next_token and records) and fetched < limit
+                stopped = more and proceed is not None and not await proceed(fetched)
+                yield {
+                    "records": records,
+                    "has_more": stopped or (next_token is not None and fetched >= limit),
+                    "next_token": next_token if fetched >= limit else None,
+                }
+                if not more or stopped:
+                    break
+        finally:
+            metrics.PAGINATION_PAGES.observe(pages, endpoint=metrics.endpoint_label(path))
 
-        return {
-            "records": all_records[:limit],
-            "has_more": next_token is not None and len(all_records) >= limit,
-            "next_token": next_token if len(all_records) >= limit else None,
-        }
+    async def _iter_sharded(
+        self,
+        path: str,
+        params: dict,
+        limit: int,
+        windows: list[dict[str, str]],
+        model: type[BaseModel] | None = None,
+        trace: tracing.Span | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Paginate each window concurrently and yield them in window order.
+
+        Windows are ordered newest first, matching the API's sort order. Each
+        shard may fetch up to an even share of limit while newer shards are still
+        running; beyond that it waits for them, and it stops once the newer shards
+        plus its own records reach limit, since nothing older would be returned.
+        This bounds the requests wasted when the newest windows alone fill limit.
+        Once the merged prefix exceeds limit, the remaining shards are cancelled.
+        """
+        semaphore = asyncio.Semaphore(settings.whoop_pagination_concurrency)
+        share = -(-limit // len(windows))
+        counts = [0] * len(windows)
+        finished = [asyncio.Event() for _ in windows]
+
+        async def fetch_shard(i: int, window: dict[str, str]) -> dict[str, Any]:
+            async def proceed(fetched: int) -> bool:
+                counts[i] = fetched
+                if fetched >= share:
+                    for event in finished[:i]:
+                        await event.wait()
+                return sum(counts[: i + 1]) < limit
+
+            try:
+                async with semaphore:
+                    shard = await collect_pages(
+                        self._iter_serial(
+                            path, {**params, **window}, limit, model, trace, proceed
+                        )
+                    )
+                counts[i] = len(shard["records"])
+                return shard
+            finally:
+                finished[i].set()
+
+        tasks = [asyncio.create_task(fetch_shard(i, w)) for i, w in enumerate(windows)]
+        fetched = 0
+        seen: set = set()
+        try:
+            for task in tasks:
+                shard = await task
+                records = []
+                for record in shard["records"]:
+                    key = _record_key(record)
+                    if key is not None:
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    records.append(record)
+                page = records[: limit - fetched]
+                fetched += len(page)
+                # A shard stopped short reports has_more, though newer shards were expected to
+                # fill limit; only duplicates across windows can leave the prefix short then
+                has_more = len(records) > len(page) or shard["has_more"]
+                yield {"records": page, "has_more": has_more, "next_token": None}
+                if has_more:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _observe_attempt(method: str, endpoint: str, status: int | str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    metrics.UPSTREAM_REQUESTS.inc(method=method, endpoint=endpoint, status=status)
+    metrics.UPSTREAM_DURATION.observe(elapsed, method=method, endpoint=endpoint, status=status)
+
+
+async def collect_pages(pages: AsyncIterator[dict[str, Any]]) -> dict[str, Any]:
+    """Gather pages from iter_pages into a single get_paginated-style response."""
+    records: list[dict] = []
+    has_more = False
+    next_token = None
+    async for page in pages:
+        records.extend(page["records"])
+        has_more = page["has_more"]
+        next_token = page["next_token"]
+    return {"records": records, "has_more": has_more, "next_token": next_token}
+
+
+def _record_key(record: dict | BaseModel) -> Any:
+    if isinstance(record, BaseModel):
+        record = record.__dict__
+    return record.get("id", record.get("cycle_id"))
+
+
+def _request_key(path: str, params: dict | None) -> str:
+    if not params:
+        return path
+    return f"{path}?{sorted(params.items())}"
+
+
+def _split_window(start: str | None, end: str | None, shards: int) -> list[dict[str, str]] | None:
+    """Split a start/end query window into contiguous sub-ranges, newest first.
+
+    Returns None when the window can't be sharded: no start, unparseable times,
+    or a span too short to give each shard at least MIN_SHARD_SPAN.
+    """
+    if not start:
+        return None
+    try:
+        start_dt = parse_iso_datetime(start)
+        end_dt = parse_iso_datetime(end) if end else datetime.now(UTC)
+    except ValueError:
+        return None
+
+    shards = min(shards, int((end_dt - start_dt) / MIN_SHARD_SPAN))
+    if shards < 2:
+        return None
+
+    step = (end_dt - start_dt) / shards
+    bounds = [start] + [format_iso_datetime(start_dt + step * i) for i in range(1, shards)] + [end]
+    windows = []
+    for lower, upper in zip(bounds[:-1], bounds[1:], strict=True):
+        window = {"start": lower}
+        if upper:
+            window["end"] = upper
+        windows.append(window)
+    return windows[::-1]
 
 
 client = WhoopClient()
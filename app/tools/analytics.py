@@ -0,0 +1,186 @@
+from mcp.server.fastmcp import FastMCP
+
+from app.services.analytics import (
+    DEFAULT_RECOVERY_METRICS,
+    DEFAULT_SLEEP_METRICS,
+    MAX_LAG,
+    METRICS,
+    PERIODS,
+    load_series,
+    load_workout_columns,
+    sleep_recovery_analysis,
+    summarize,
+    training_load,
+)
+from app.services.whoop_client import MAX_LIMIT, WhoopAPIError
+
+
+def _check_metrics(names: list[str], collection: str) -> None:
+    allowed = [name for name, metric in METRICS.items() if metric.collection == collection]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Unknown {collection} metric(s) {', '.join(unknown)}, "
+            f"expected any of {', '.join(allowed)}"
+        )
+
+
+def register_analytics_tools(mcp: FastMCP):
+    @mcp.tool()
+    async def summarize_metric(
+        metric: str,
+        start: str | None = None,
+        end: str | None = None,
+        period: str = "week",
+        rolling_window: int | None = None,
+        limit: int = MAX_LIMIT,
+    ) -> dict:
+        """Summarize one metric over a date range without returning the records.
+
+        Fetches the history server-side and returns statistics only: overall
+        mean/std/min/max, percentiles, a day/week/month rollup, per-weekday and
+        weekday-vs-weekend means, and optionally a rolling mean. Use this for
+        trend questions ("average HRV by weekday over 6 months") instead of
+        pulling records with get_recoveries/get_sleeps/get_cycles/get_workouts.
+
+        Args:
+            metric: One of:
+                recovery: recovery_score, hrv, resting_heart_rate, spo2, skin_temp
+                sleep (naps excluded): sleep_performance, sleep_efficiency,
+                    sleep_consistency, respiratory_rate, sleep_hours,
+                    deep_sleep_hours, rem_sleep_hours
+                cycle (day): strain, kilojoule, average_heart_rate
+                workout (per workout): workout_strain, workout_kilojoule,
+                    workout_distance
+            start: Start datetime (ISO 8601)
+            end: End datetime (ISO 8601)
+            period: Rollup granularity: "day", "week" (starting Monday) or "month"
+            rolling_window: If set, include a trailing mean over this many days (at least 1)
+            limit: Max records to fetch (default and max 1000)
+
+        Returns:
+            metric, unit, count, first_date, last_date, mean, std, min, max
+            percentiles: p5, p25, p50, p75, p95
+            rollup: Oldest first, each with period_start, mean, min, max, sum, count
+            by_weekday: Weekday name -> mean, count
+            weekday/weekend: Mean and count for Mon-Fri vs Sat-Sun
+            rolling_mean: With rolling_window, date -> mean for each day with data
+
+        Days follow each record's date field (end time in the user's timezone);
+        recoveries use the date of their cycle.
+        """
+        if metric not in METRICS:
+            return {"error": f"Unknown metric '{metric}', expected one of {', '.join(METRICS)}"}
+        if period not in PERIODS:
+            return {"error": f"Unknown period '{period}', expected one of {', '.join(PERIODS)}"}
+        if rolling_window is not None and rolling_window < 1:
+            return {"error": "rolling_window must be at least 1 day"}
+        try:
+            params = {}
+            if start:
+                params["start"] = start
+            if end:
+                params["end"] = end
+            definition = METRICS[metric]
+            series = await load_series(definition, params, limit)
+            return {
+                "metric": metric,
+                "unit": definition.unit,
+                **summarize(series, period, rolling_window),
+            }
+        except WhoopAPIError as e:
+            return {"error": e.message, "status_code": e.status_code}
+
+    @mcp.tool()
+    async def get_training_load(
+        start: str | None = None,
+        end: str | None = None,
+        limit: int = MAX_LIMIT,
+    ) -> dict:
+        """Aggregate workouts into training load by sport and by week.
+
+        Returns totals and per-workout averages only, not the workouts, so
+        training-load questions ("how much zone 2 did I do per week?") take one
+        call.
+
+        Args:
+            start: Start datetime (ISO 8601)
+            end: End datetime (ISO 8601)
+            limit: Max workouts to fetch (default and max 1000)
+
+        Returns:
+            workouts, first_date, last_date
+            total / average: Across all workouts, each with
+              - zone_minutes: Minutes in HR zones 0-5 (list of 6)
+              - strain, kilojoule, distance_meter
+            by_sport: Per sport_id, same fields plus workouts count
+            by_week: Per week (week_start is the Monday), same fields
+
+        Averages are per workout that reported the value (None if none did).
+        """
+        try:
+            params = {}
+            if start:
+                params["start"] = start
+            if end:
+                params["end"] = end
+            return training_load(await load_workout_columns(params, limit))
+        except WhoopAPIError as e:
+            return {"error": e.message, "status_code": e.status_code}
+
+    @mcp.tool()
+    async def analyze_sleep_recovery(
+        start: str | None = None,
+        end: str | None = None,
+        sleep_metrics: list[str] | None = None,
+        recovery_metrics: list[str] | None = None,
+        max_lag: int = 1,
+        limit: int = MAX_LIMIT,
+    ) -> dict:
+        """Correlate sleep metrics with recovery metrics, same night and lagged.
+
+        Fetches sleeps and recoveries for the range, pairs each recovery with the
+        sleep it was scored from, and returns Pearson correlations plus the
+        paired series. Answers questions like "does deep sleep predict HRV?"
+        without pulling both collections.
+
+        Args:
+            start: Start datetime (ISO 8601)
+            end: End datetime (ISO 8601)
+            sleep_metrics: Any of sleep_hours, deep_sleep_hours, rem_sleep_hours,
+                sleep_efficiency, sleep_performance, sleep_consistency,
+                respiratory_rate (default: sleep_hours, deep_sleep_hours,
+                rem_sleep_hours, sleep_efficiency)
+            recovery_metrics: Any of recovery_score, hrv, resting_heart_rate,
+                spo2, skin_temp (default: recovery_score, hrv, resting_heart_rate)
+            max_lag: Also correlate each night's sleep with recovery up to this
+                many days later (0-14, default 1)
+            limit: Max records to fetch per collection (default and max 1000)
+
+        Returns:
+            pairs: Number of sleep/recovery pairs, with first_date and last_date
+            lags: Day offsets, [0, 1, ...]; lag 0 is the recovery scored from that sleep
+            correlations: recovery metric -> sleep metric -> r (one per lag,
+              None if fewer than 3 pairs) and n (pairs used per lag)
+            series: Paired values oldest first: date (the sleep's date) and one
+              list per metric
+        """
+        sleep_metrics = list(sleep_metrics or DEFAULT_SLEEP_METRICS)
+        recovery_metrics = list(recovery_metrics or DEFAULT_RECOVERY_METRICS)
+        if not 0 <= max_lag <= MAX_LAG:
+            return {"error": f"max_lag must be between 0 and {MAX_LAG}"}
+        try:
+            _check_metrics(sleep_metrics, "sleep")
+            _check_metrics(recovery_metrics, "recovery")
+            params = {}
+            if start:
+                params["start"] = start
+            if end:
+                params["end"] = end
+            return await sleep_recovery_analysis(
+                sleep_metrics, recovery_metrics, params, limit, max_lag
+            )
+        except WhoopAPIError as e:
+            return {"error": e.message, "status_code": e.status_code}
+        except ValueError as e:
+            return {"error": str(e)}
@@ -1,8 +1,13 @@
+from fastmcp import Context
 from mcp.server.fastmcp import FastMCP
 
 from app.schemas.cycle import Cycle
+from app.schemas.recovery import Recovery
+from app.schemas.sleep import Sleep
+from app.services.collections import fetch_collection
+from app.services.fanout import fan_out, optional
 from app.services.whoop_client import WhoopAPIError, client
-from app.utils.timezone import preprocess_response, preprocess_timestamps
+from app.utils.timezone import preprocess_timestamps
 
 
 def register_cycle_tools(mcp: FastMCP):
@@ -11,6 +16,10 @@ def register_cycle_tools(mcp: FastMCP):
         start: str | None = None,
         end: str | None = None,
         limit: int = 25,
+        fields: list[str] | None = None,
+        compact: bool = False,
+        columnar: bool = False,
+        ctx: Context | None = None,
     ) -> dict:
         """Get collection of physiological cycles.
 
@@ -21,11 +30,19 @@ def register_cycle_tools(mcp: FastMCP):
             start: Start datetime (ISO 8601, e.g. "2024-01-01T00:00:00Z")
             end: End datetime (ISO 8601)
             limit: Max records to return (default 25, max 1000)
+            fields: Only return these fields, e.g. ["date", "score.strain"]
+                (dotted paths select inside nested objects)
+            compact: Drop null values and move values shared by every record
+                (e.g. user_id, timezone_offset) into a `constants` header
+            columnar: Return `columns`, one array per field (nested objects
+                flattened to dotted names like "score.strain"), instead of records
 
         Returns:
             records: List of cycles with scores (strain, kilojoule, heart rates)
             has_more: Whether more records exist
             next_token: Token for manual pagination if needed
+            constants: With compact, values shared by every record
+            columns: With columnar, field name -> list of values, one per record
 
         Timestamps:
         - start/end: Time when cycle started/ended in the user's timezone at that location
@@ -48,16 +65,13 @@ def register_cycle_tools(mcp: FastMCP):
                 params["start"] = start
             if end:
                 params["end"] = end
-            response = await client.get_paginated("/v2/cycle", params, limit)
-            response = preprocess_response(response)
-
-            # Parse records through Pydantic models
-            response["records"] = [
-                Cycle(**record).model_dump() for record in response["records"]
-            ]
-            return response
+            return await fetch_collection(
+                "/v2/cycle", params, limit, Cycle, ctx, fields, compact, columnar
+            )
         except WhoopAPIError as e:
             return {"error": e.message, "status_code": e.status_code}
+        except ValueError as e:
+            return {"error": str(e)}
 
     @mcp.tool()
     async def get_cycle(
@@ -81,32 +95,27 @@ def register_cycle_tools(mcp: FastMCP):
         for all sleep sessions including naps.
         """
         try:
-            cycle = await client.get(f"/v2/cycle/{cycle_id}")
+            # Fetch the cycle and requested related records concurrently
+            sleep_request = recovery_request = None
+            if include_sleep:
+                sleep_request = optional(client.get(f"/v2/cycle/{cycle_id}/sleep"))
+            if include_recovery:
+                recovery_request = optional(client.get(f"/v2/cycle/{cycle_id}/recovery"))
+            cycle, sleep, recovery = await fan_out(
+                client.get(f"/v2/cycle/{cycle_id}"), sleep_request, recovery_request
+            )
             cycle = preprocess_timestamps(cycle)
             result = {"cycle": Cycle(**cycle).model_dump()}
 
             if include_sleep:
-                try:
-                    from app.schemas.sleep import Sleep
-
-                    sleep = await client.get(f"/v2/cycle/{cycle_id}/sleep")
-                    sleep = preprocess_timestamps(sleep)
-                    result["sleep"] = Sleep(**sleep).model_dump()
-                except WhoopAPIError as e:
-                    if e.status_code != 404:
-                        raise
-                    result["sleep"] = None
+                if sleep is not None:
+                    sleep = Sleep(**preprocess_timestamps(sleep)).model_dump()
+                result["sleep"] = sleep
 
             if include_recovery:
-                try:
-                    from app.schemas.recovery import Recovery
-
-                    recovery = await client.get(f"/v2/cycle/{cycle_id}/recovery")
-                    result["recovery"] = Recovery(**recovery).model_dump()
-                except WhoopAPIError as e:
-                    if e.status_code != 404:
-                        raise
-                    result["recovery"] = None
+                if recovery is not None:
+                    recovery = Recovery(**recovery).model_dump()
+                result["recovery"] = recovery
 
             return result
         except WhoopAPIError as e:
@@ -0,0 +1,129 @@
+from bisect import bisect_right
+from datetime import timedelta
+
+from mcp.server.fastmcp import FastMCP
+
+from app.schemas.cycle import Cycle
+from app.schemas.recovery import Recovery
+from app.schemas.sleep import Sleep
+from app.schemas.workout import Workout
+from app.services.collections import get_all_collection, get_collection
+from app.services.fanout import fan_out
+from app.services.whoop_client import WhoopAPIError
+from app.utils.timezone import format_iso_datetime, localize_records
+
+# Sleeps that start a cycle can begin shortly before the cycle's recorded start
+SLEEP_WINDOW_MARGIN = timedelta(days=1)
+
+
+def join_daily_records(
+    cycles: list[dict],
+    sleeps: list[dict],
+    recoveries: list[dict],
+    workouts: list[dict],
+) -> list[dict]:
+    """Join preprocessed collection records into one entry per cycle.
+
+    Recoveries are matched on cycle_id and primary sleeps on the recovery's
+    sleep_id (falling back to a non-nap sleep with the same cycle_id), both via
+    dict indexes. Workouts are assigned to the cycle whose start/end contains
+    their start time.
+    """
+    recovery_by_cycle = {r["cycle_id"]: r for r in recoveries}
+    sleep_by_id = {s["id"]: s for s in sleeps}
+    primary_sleep_by_cycle = {
+        s["cycle_id"]: s for s in sleeps if s.get("cycle_id") is not None and not s.get("nap")
+    }
+
+    by_start = sorted(cycles, key=lambda c: c["start"])
+    starts = [c["start"] for c in by_start]
+    workouts_by_cycle: dict[int, list[dict]] = {c["id"]: [] for c in cycles}
+    for workout in sorted(workouts, key=lambda w: w["start"]):
+        i = bisect_right(starts, workout["start"]) - 1
+        if i < 0:
+            continue
+        cycle = by_start[i]
+        if cycle.get("end") is None or workout["start"] < cycle["end"]:
+            workouts_by_cycle[cycle["id"]].append(workout)
+
+    days = []
+    for cycle in cycles:
+        recovery = recovery_by_cycle.get(cycle["id"])
+        sleep = None
+        if recovery is not None:
+            sleep = sleep_by_id.get(recovery["sleep_id"])
+        if sleep is None:
+            sleep = primary_sleep_by_cycle.get(cycle["id"])
+
+        cycle_data = Cycle(**cycle).model_dump()
+        days.append(
+            {
+                "date": cycle_data["date"],
+                "weekday": cycle_data["weekday"],
+                "is_weekend": cycle_data["is_weekend"],
+                "cycle": cycle_data,
+                "sleep": Sleep(**sleep).model_dump() if sleep is not None else None,
+                "recovery": Recovery(**recovery).model_dump() if recovery is not None else None,
+                "workouts": [Workout(**w).model_dump() for w in workouts_by_cycle[cycle["id"]]],
+            }
+        )
+    return days
+
+
+def register_daily_tools(mcp: FastMCP):
+    @mcp.tool()
+    async def get_daily_summaries(
+        start: str | None = None,
+        end: str | None = None,
+        limit: int = 25,
+    ) -> dict:
+        """Get one combined record per day: cycle, primary sleep, recovery and workouts.
+
+        Fetches the cycles, then every sleep, recovery and workout in the window
+        they cover, and joins them, instead of calling get_cycle per day.
+
+        Args:
+            start: Start datetime (ISO 8601, e.g. "2024-01-01T00:00:00Z")
+            end: End datetime (ISO 8601)
+            limit: Max days (cycles) to return (default 25, max 1000)
+
+        Returns:
+            records: List of days, newest first, each with:
+              - date, weekday, is_weekend: Based on the cycle (see get_cycles)
+              - cycle: Cycle data (same fields as get_cycles)
+              - sleep: PRIMARY sleep that started the cycle, or None
+              - recovery: Recovery for the cycle, or None
+              - workouts: Workouts that started during the cycle
+            has_more: Whether more days exist
+            next_token: Token for manual pagination of cycles
+        """
+        try:
+            params = {}
+            if start:
+                params["start"] = start
+            if end:
+                params["end"] = end
+            response = await get_collection("/v2/cycle", params, limit)
+            cycles = localize_records(response["records"])
+            if not cycles:
+                return response
+
+            # Related records only need to cover the cycles actually returned, but
+            # all of them: that window can hold more than MAX_LIMIT workouts
+            earliest = min(c["start"] for c in cycles) - SLEEP_WINDOW_MARGIN
+            related = {**params, "start": format_iso_datetime(earliest)}
+            sleeps, recoveries, workouts = await fan_out(
+                get_all_collection("/v2/activity/sleep", related),
+                get_all_collection("/v2/recovery", related),
+                get_all_collection("/v2/activity/workout", related),
+            )
+
+            response["records"] = join_daily_records(
+                cycles,
+                localize_records(sleeps),
+                recoveries,
+                localize_records(workouts),
+            )
+            return response
+        except WhoopAPIError as e:
+            return {"error": e.message, "status_code": e.status_code}
@@ -0,0 +1,22 @@
+from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.services import metrics
+from app.services.whoop_client import client
+
+
+def register_diagnostic_resources(mcp: FastMCP):
+    @mcp.resource("whoop://stats/cache", mime_type="application/json")
+    def cache_stats() -> dict:
+        """Response cache size and hit/miss counters for sizing WHOOP_CACHE_MAX_ENTRIES."""
+        return client.cache.stats()
+
+    @mcp.resource("whoop://metrics", mime_type="text/plain")
+    def metrics_text() -> str:
+        """Tool, upstream request, pagination and validation/serialization metrics (OpenMetrics)."""
+        return metrics.registry.render()
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> Response:
+        return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
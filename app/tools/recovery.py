@@ -1,6 +1,8 @@
+from fastmcp import Context
 from mcp.server.fastmcp import FastMCP
 
 from app.schemas.recovery import Recovery
+from app.services.collections import fetch_collection
 from app.services.whoop_client import WhoopAPIError, client
 
 
@@ -10,6 +12,10 @@ def register_recovery_tools(mcp: FastMCP):
         start: str | None = None,
         end: str | None = None,
         limit: int = 25,
+        fields: list[str] | None = None,
+        compact: bool = False,
+        columnar: bool = False,
+        ctx: Context | None = None,
     ) -> dict:
         """Get collection of recovery records.
 
@@ -20,11 +26,19 @@ def register_recovery_tools(mcp: FastMCP):
             start: Start datetime (ISO 8601)
             end: End datetime (ISO 8601)
             limit: Max records to return (default 25, max 1000)
+            fields: Only return these fields, e.g. ["cycle_id", "score.hrv_rmssd_milli"]
+                (dotted paths select inside nested objects)
+            compact: Drop null values and move values shared by every record
+                (e.g. user_id, timezone_offset) into a `constants` header
+            columnar: Return `columns`, one array per field (nested objects
+                flattened to dotted names like "score.recovery_score"), instead of records
 
         Returns:
             records: List of recovery records with scores
             has_more: Whether more records exist
             next_token: Token for manual pagination
+            constants: With compact, values shared by every record
+            columns: With columnar, field name -> list of values, one per record
 
         Score fields:
         - recovery_score: 0-100% (green 67-100, yellow 34-66, red 0-33)
@@ -39,15 +53,13 @@ def register_recovery_tools(mcp: FastMCP):
                 params["start"] = start
             if end:
                 params["end"] = end
-            response = await client.get_paginated("/v2/recovery", params, limit)
-
-            # Parse records through Pydantic models
-            response["records"] = [
-                Recovery(**record).model_dump() for record in response["records"]
-            ]
-            return response
+            return await fetch_collection(
+                "/v2/recovery", params, limit, Recovery, ctx, fields, compact, columnar
+            )
         except WhoopAPIError as e:
             return {"error": e.message, "status_code": e.status_code}
+        except ValueError as e:
+            return {"error": str(e)}
 
     @mcp.tool()
     async def get_recovery(cycle_id: int) -> dict:
@@ -1,5 +1,6 @@
 from mcp.server.fastmcp import FastMCP
 
+from app.services.fanout import fan_out
 from app.services.whoop_client import WhoopAPIError, client
 
 
@@ -17,8 +18,10 @@ def register_user_tools(mcp: FastMCP):
         - max_heart_rate: BPM
         """
         try:
-            profile = await client.get("/v2/user/profile/basic")
-            body = await client.get("/v2/user/measurement/body")
+            profile, body = await fan_out(
+                client.get("/v2/user/profile/basic"),
+                client.get("/v2/user/measurement/body"),
+            )
             return {"profile": profile, "body_measurement": body}
         except WhoopAPIError as e:
             return {"error": e.message, "status_code": e.status_code}
@@ -1,8 +1,10 @@
+from fastmcp import Context
 from mcp.server.fastmcp import FastMCP
 
 from app.schemas.workout import Workout
+from app.services.collections import fetch_collection
 from app.services.whoop_client import WhoopAPIError, client
-from app.utils.timezone import preprocess_response, preprocess_timestamps
+from app.utils.timezone import preprocess_timestamps
 
 
 def register_workout_tools(mcp: FastMCP):
@@ -11,6 +13,10 @@ def register_workout_tools(mcp: FastMCP):
         start: str | None = None,
         end: str | None = None,
         limit: int = 25,
+        fields: list[str] | None = None,
+        compact: bool = False,
+        columnar: bool = False,
+        ctx: Context | None = None,
     ) -> dict:
         """Get collection of workout records.
 
@@ -20,11 +26,19 @@ def register_workout_tools(mcp: FastMCP):
             start: Start datetime (ISO 8601)
             end: End datetime (ISO 8601)
             limit: Max records to return (default 25, max 1000)
+            fields: Only return these fields, e.g. ["date", "sport_id", "score.strain"]
+                (dotted paths select inside nested objects)
+            compact: Drop null values and move values shared by every record
+                (e.g. user_id, timezone_offset) into a `constants` header
+            columnar: Return `columns`, one array per field (nested objects
+                flattened to dotted names like "score.strain"), instead of records
 
         Returns:
             records: List of workouts with scores
             has_more: Whether more records exist
             next_token: Token for manual pagination
+            constants: With compact, values shared by every record
+            columns: With columnar, field name -> list of values, one per record
 
         Timestamps:
         - start/end: Time when workout started/ended in the user's timezone at that location
@@ -50,16 +64,13 @@ def register_workout_tools(mcp: FastMCP):
                 params["start"] = start
             if end:
                 params["end"] = end
-            response = await client.get_paginated("/v2/activity/workout", params, limit)
-            response = preprocess_response(response)
-
-            # Parse records through Pydantic models
-            response["records"] = [
-                Workout(**record).model_dump() for record in response["records"]
-            ]
-            return response
+            return await fetch_collection(
+                "/v2/activity/workout", params, limit, Workout, ctx, fields, compact, columnar
+            )
         except WhoopAPIError as e:
             return {"error": e.message, "status_code": e.status_code}
+        except ValueError as e:
+            return {"error": str(e)}
 
     @mcp.tool()
     async def get_workout(workout_id: str) -> dict:
@@ -1,3 +1,3 @@
-from app.utils.timezone import preprocess_response, preprocess_timestamps
+from app.utils.timezone import localize_records, preprocess_response, preprocess_timestamps
 
-__all__ = ["preprocess_response", "preprocess_timestamps"]
+__all__ = ["localize_records", "preprocess_response", "preprocess_timestamps"]
@@ -3,12 +3,20 @@
 Converts UTC timestamps to the user's local timezone when the event was recorded.
 """
 
-from datetime import datetime, timedelta, timezone
+from datetime import UTC, date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
 
+TIMESTAMP_FIELDS = ("start", "end", "created_at", "updated_at")
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
 
+
+@lru_cache(maxsize=256)
 def parse_timezone_offset(offset_str: str) -> timezone:
     """Parse WHOOP timezone offset string to a timezone object.
 
+    Cached, so every record sharing an offset also shares one tzinfo instance.
+
     Args:
         offset_str: Timezone offset like '+05:30', '-08:00', or '+00:00'
 
@@ -20,6 +28,31 @@ def parse_timezone_offset(offset_str: str) -> timezone:
     return timezone(timedelta(hours=sign * hours, minutes=sign * minutes))
 
 
+def parse_iso_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 string to an aware datetime, assuming UTC when no offset is given.
+
+    Args:
+        value: ISO 8601 datetime string (e.g., '2024-01-08T17:30:00Z')
+
+    Returns:
+        A timezone-aware datetime
+    """
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+
+def format_iso_datetime(dt: datetime) -> str:
+    """Format a datetime as a UTC ISO 8601 string with millisecond precision.
+
+    Args:
+        dt: A timezone-aware datetime
+
+    Returns:
+        String like '2024-01-08T17:30:00.000Z'
+    """
+    return dt.astimezone(UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
 def convert_to_local_time(iso_string: str, timezone_offset: str | None) -> datetime:
     """Convert an ISO datetime string to the user's local timezone.
 
@@ -30,15 +63,76 @@ def convert_to_local_time(iso_string: str, timezone_offset: str | None) -> datet
     Returns:
         Datetime in the user's local timezone
     """
-    # Parse ISO string to datetime
-    dt = datetime.fromisoformat(iso_string.replace("Z", "+00:00"))
+    # fromisoformat accepts the 'Z' suffix since Python 3.11
+    dt = datetime.fromisoformat(iso_string)
 
     if not timezone_offset:
         return dt
 
     # Convert to local timezone
-    tz = parse_timezone_offset(timezone_offset)
-    return dt.astimezone(tz)
+    return dt.astimezone(parse_timezone_offset(timezone_offset))
+
+
+@lru_cache(maxsize=4096)
+def _format_local_datetime(value: datetime, utcoffset: timedelta | None, offset: str) -> str:
+    # Equal datetimes in different zones hash alike, so utcoffset is part of the key
+    hour = value.hour % 12 or 12
+    meridiem = "PM" if value.hour >= 12 else "AM"
+    return (
+        f"{value.year:04d}-{value.month:02d}-{value.day:02d} "
+        f"{hour:02d}:{value.minute:02d} {meridiem} ({offset})"
+    )
+
+
+def format_local_datetime(value: datetime, offset: str) -> str:
+    """Format a local datetime for display, memoized per (timestamp, offset).
+
+    Equivalent to `f"{value.strftime('%Y-%m-%d %I:%M %p')} ({offset})"`.
+
+    Args:
+        value: Datetime already in the user's local timezone
+        offset: WHOOP timezone offset string (e.g., '-08:00')
+
+    Returns:
+        String like '2024-01-15 07:00 AM (-08:00)'
+    """
+    return _format_local_datetime(value, value.utcoffset(), offset)
+
+
+def local_day(value: datetime) -> tuple[date, str, bool]:
+    """Date, weekday name and weekend flag of a local datetime.
+
+    Args:
+        value: Datetime in the user's local timezone
+
+    Returns:
+        Tuple like (date(2024, 1, 15), 'Monday', False)
+    """
+    weekday = value.weekday()
+    return value.date(), WEEKDAY_NAMES[weekday], weekday >= 5
+
+
+def localize_timestamps(record: Any) -> Any:
+    """Convert a parsed record's datetime fields to the user's local timezone.
+
+    Used by the schema validators so that parsing raw API JSON and localizing
+    happen in the same pass. Fields that are already local are left unchanged.
+
+    Args:
+        record: A model instance with 'timezone_offset' and timestamp attributes
+
+    Returns:
+        The same record, with timestamps in the user's local timezone
+    """
+    if not record.timezone_offset:
+        return record
+    tz = parse_timezone_offset(record.timezone_offset)
+    local_offset = tz.utcoffset(None)
+    for field in TIMESTAMP_FIELDS:
+        value = getattr(record, field)
+        if value is not None and value.utcoffset() != local_offset:
+            setattr(record, field, value.astimezone(tz))
+    return record
 
 
 def preprocess_timestamps(record: dict) -> dict:
@@ -54,17 +148,44 @@ def preprocess_timestamps(record: dict) -> dict:
         The record with timestamp strings converted to local datetime objects
     """
     tz_offset = record.get("timezone_offset")
-    timestamp_fields = ["start", "end", "created_at", "updated_at"]
+    tz = parse_timezone_offset(tz_offset) if tz_offset else None
 
-    for field in timestamp_fields:
-        if field in record and record[field] is not None:
-            value = record[field]
-            if isinstance(value, str):
-                record[field] = convert_to_local_time(value, tz_offset)
+    for field in TIMESTAMP_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            dt = datetime.fromisoformat(value)
+            record[field] = dt.astimezone(tz) if tz else dt
 
     return record
 
 
+def localize_records(records: list[dict]) -> list[dict]:
+    """Convert timestamp strings to local datetimes for a whole page of records.
+
+    Same result as calling preprocess_timestamps on each record, but the
+    fromisoformat/astimezone calls are bound once and the offset lookup is
+    shared by consecutive records in the same timezone.
+
+    Args:
+        records: WHOOP API record dicts, converted in place
+
+    Returns:
+        The same list, with timestamp strings converted to local datetime objects
+    """
+    parse = datetime.fromisoformat
+    to_local = datetime.astimezone
+    last_offset, tz = None, None
+    for record in records:
+        offset = record.get("timezone_offset")
+        if offset != last_offset:
+            last_offset, tz = offset, parse_timezone_offset(offset) if offset else None
+        for field in TIMESTAMP_FIELDS:
+            value = record.get(field)
+            if isinstance(value, str):
+                record[field] = to_local(parse(value), tz) if tz else parse(value)
+    return records
+
+
 def preprocess_response(response: dict) -> dict:
     """Convert timestamps in a paginated API response.
 
@@ -75,9 +196,7 @@ def preprocess_response(response: dict) -> dict:
         The response with timestamp strings converted to local datetime objects
     """
     if "records" in response and isinstance(response["records"], list):
-        response["records"] = [
-            preprocess_timestamps(record) for record in response["records"]
-        ]
+        response["records"] = localize_records(response["records"])
     elif "error" not in response:
         # Single record response
         response = preprocess_timestamps(response)
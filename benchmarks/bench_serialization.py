@@ -0,0 +1,126 @@
+"""Records/sec for serializing validated records, before and after the fast path.
+
+"before" reproduces the original serializers: strftime on every timestamp and
+each of date/weekday/is_weekend re-deriving the anchor datetime, then
+model_dump() dicts re-encoded to JSON the way FastMCP does. "after" uses the
+current models (memoized formatting, day fields computed once per record),
+both through dump_records-style dicts, which is what the tools return, and
+straight to JSON bytes. All three outputs are asserted byte-for-byte identical
+before timing. The reported speedup is for the dict path; the JSON path is
+shown for reference only, since no tool serializes that way.
+
+Usage:
+    uv run python -m benchmarks.bench_serialization [--records 1000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import json
+import os
+import time
+from datetime import date, datetime
+
+os.environ.setdefault("WHOOP_ACCESS_TOKEN", "benchmark")
+
+from pydantic import computed_field, field_serializer  # noqa: E402
+from pydantic_core import to_json  # noqa: E402
+
+from app.schemas import Cycle, Sleep, Workout  # noqa: E402
+from app.schemas.page import dump_records_json, records_adapter  # noqa: E402
+from benchmarks.records import make_records  # noqa: E402
+
+
+def _legacy(model):
+    class Legacy(model):
+        @field_serializer("start", "end", "created_at", "updated_at")
+        def serialize_datetime(self, value: datetime | None) -> str | None:
+            if value is None:
+                return None
+            if self.timezone_offset:
+                return f"{value.strftime('%Y-%m-%d %I:%M %p')} ({self.timezone_offset})"
+            return value.isoformat()
+
+        @computed_field
+        @property
+        def date(self) -> date:
+            dt = self.end if self.end is not None else self.start
+            return dt.date()
+
+        @computed_field
+        @property
+        def weekday(self) -> str:
+            dt = self.end if self.end is not None else self.start
+            return dt.strftime("%A")
+
+        @computed_field
+        @property
+        def is_weekend(self) -> bool:
+            dt = self.end if self.end is not None else self.start
+            return dt.weekday() >= 5
+
+    Legacy.__name__ = model.__name__
+    return Legacy
+
+
+MODELS = {"cycle": Cycle, "sleep": Sleep, "workout": Workout}
+
+
+def before(model, records: list) -> bytes:
+    return to_json([record.model_dump() for record in records], fallback=str)
+
+
+def after_dicts(model, records: list) -> bytes:
+    return to_json(records_adapter(model).dump_python(records), fallback=str)
+
+
+def after_json(model, records: list) -> bytes:
+    return dump_records_json(model, records)
+
+
+def best_rate(fn, model, raw: list[dict], repeat: int) -> float:
+    adapter = records_adapter(model)
+    best = float("inf")
+    for _ in range(repeat):
+        # Fresh instances each round so per-record caches start cold
+        batch = adapter.validate_python(raw)
+        gc.disable()
+        started = time.perf_counter()
+        fn(model, batch)
+        best = min(best, time.perf_counter() - started)
+        gc.enable()
+    return len(raw) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for kind, model in MODELS.items():
+        raw = make_records(kind, args.records)
+        legacy = _legacy(model)
+        expected = before(legacy, records_adapter(legacy).validate_python(raw))
+        current = records_adapter(model).validate_python(raw)
+        assert after_dicts(model, current) == expected, f"{kind}: dict output differs"
+        assert after_json(model, current) == expected, f"{kind}: JSON output differs"
+        old = best_rate(before, legacy, raw, args.repeat)
+        dicts = best_rate(after_dicts, model, raw, args.repeat)
+        direct = best_rate(after_json, model, raw, args.repeat)
+        results[kind] = {
+            "before_records_per_sec": round(old),
+            "after_dict_records_per_sec": round(dicts),
+            "after_json_records_per_sec": round(direct),
+            "speedup": round(dicts / old, 2),
+        }
+        print(
+            f"{kind:<8} before {old:>10,.0f}/s  dicts {dicts:>10,.0f}/s  "
+            f"x{dicts / old:.2f}  (json {direct:>10,.0f}/s)"
+        )
+
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""End-to-end benchmark suite against the in-process fake WHOOP API.
+
+Times WhoopClient.get_paginated per collection, each collection tool called
+through the real FastMCP server (in-memory transport), and page validation and
+serialization. Upstream latency, 429s and token expiry come from FakeWhoop.
+Results are written as JSON so runs can be diffed release over release;
+--compare prints the change against an earlier results file.
+
+Usage:
+    uv run python -m benchmarks.bench_suite [--records 1000] [--repeat 5]
+        [--latency-ms 0] [--rate-limit-every 0] [--expire-token-every 0]
+        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+
+os.environ.setdefault("WHOOP_ACCESS_TOKEN", "benchmark")
+
+from fastmcp import Client  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.main import mcp  # noqa: E402
+from app.schemas import Cycle, Recovery, Sleep, Workout  # noqa: E402
+from app.services.cache import ResponseCache  # noqa: E402
+from app.services.rate_limit import RateLimiter  # noqa: E402
+from app.services.whoop_client import client  # noqa: E402
+from benchmarks import bench_serialization, bench_validation  # noqa: E402
+from benchmarks.fake_whoop import COLLECTIONS, FakeWhoop  # noqa: E402
+from benchmarks.records import make_page, make_records  # noqa: E402
+
+TOOLS = ("get_cycles", "get_sleeps", "get_recoveries", "get_workouts", "get_daily_summaries")
+MODELS = {"cycle": Cycle, "sleep": Sleep, "recovery": Recovery, "workout": Workout}
+
+
+def configure(args: argparse.Namespace) -> FakeWhoop:
+    """Lift client-side rate limits, drop the cache unless --cache, and attach the fake."""
+    settings.whoop_rate_limit_per_minute = 10**9
+    settings.whoop_rate_limit_per_day = 10**9
+    settings.whoop_rate_limit_burst = 10**9
+    client.rate_limiter = RateLimiter()
+    client.cache = ResponseCache(settings.whoop_cache_max_entries if args.cache else 0)
+    fake = FakeWhoop(
+        records=args.records,
+        latency=args.latency_ms / 1000,
+        rate_limit_every=args.rate_limit_every,
+        expire_token_every=args.expire_token_every,
+    )
+    fake.attach(client)
+    return fake
+
+
+async def measure(
+    name: str,
+    run: Callable[[], Awaitable[int]],
+    fake: FakeWhoop,
+    repeat: int,
+) -> dict:
+    """Run `run` (returning a record count) `repeat` times and summarize the timings."""
+    timings: list[float] = []
+    records = 0
+    fake.reset_counters()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = await run()
+        timings.append(time.perf_counter() - started)
+    counters = fake.counters()
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        "records": records,
+        "median_seconds": round(median, 6),
+        "best_seconds": round(min(timings), 6),
+        "records_per_sec": round(records / median) if median else None,
+        "upstream_requests_per_run": counters["requests"] / repeat,
+        "rate_limited": counters["rate_limited"],
+        "unauthorized": counters["unauthorized"],
+        "refreshes": counters["refreshes"],
+    }
+
+
+async def bench_paginated(fake: FakeWhoop, args: argparse.Namespace) -> list[dict]:
+    results = []
+    for path, kind in COLLECTIONS.items():
+
+        async def run(path: str = path) -> int:
+            response = await client.get_paginated(path, {}, args.records)
+            return len(response["records"])
+
+        results.append(await measure(f"get_paginated/{kind}", run, fake, args.repeat))
+    return results
+
+
+async def bench_tools(fake: FakeWhoop, args: argparse.Namespace) -> list[dict]:
+    results = []
+    async with Client(mcp) as session:
+        for tool in TOOLS:
+
+            async def run(tool: str = tool) -> int:
+                result = await session.call_tool(tool, {"limit": args.records})
+                return len(result.structured_content["records"])
+
+            results.append(await measure(f"tool/{tool}", run, fake, args.repeat))
+    return results
+
+
+def bench_cpu(args: argparse.Namespace) -> list[dict]:
+    """Validation and serialization throughput, without any I/O."""
+    results = []
+    size = bench_validation.PAGE_SIZE
+    for kind, model in MODELS.items():
+        pages = [make_page(kind, size, seed=i) for i in range(0, args.records, size)]
+        count = len(pages) * size
+        rate = bench_validation.best_rate(bench_validation.after, model, pages, count, args.repeat)
+        results.append(
+            {"name": f"validate/{kind}", "records": count, "records_per_sec": round(rate)}
+        )
+        raw = make_records(kind, args.records)
+        rate = bench_serialization.best_rate(
+            bench_serialization.after_json, model, raw, args.repeat
+        )
+        results.append(
+            {"name": f"serialize/{kind}", "records": len(raw), "records_per_sec": round(rate)}
+        )
+    return results
+
+
+def metadata(args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+    }
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    """Print records/sec change for each benchmark also present in the baseline."""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    for result in results:
+        old = baseline.get(result["name"], {}).get("records_per_sec")
+        new = result.get("records_per_sec")
+        if old and new:
+            change = (new / old - 1) * 100
+            print(
+                f"{result['name']:<28} {old:>10,} -> {new:>10,}/s  {change:+6.1f}%",
+                file=sys.stderr,
+            )
+
+
+async def run_suite(args: argparse.Namespace) -> dict:
+    fake = configure(args)
+    results = [*await bench_paginated(fake, args), *await bench_tools(fake, args)]
+    results.extend(bench_cpu(args))
+    await client.aclose()
+    return {"meta": metadata(args), "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000, help="records per collection")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake upstream latency")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="429 every Nth request")
+    parser.add_argument(
+        "--expire-token-every", type=int, default=0, help="rotate the token every Nth request"
+    )
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    # Retries on injected 429s/401s would otherwise log a warning each
+    logging.disable(logging.WARNING)
+    report = asyncio.run(run_suite(args))
+
+    for result in report["results"]:
+        line = f"{result['name']:<28} {result['records_per_sec']:>10,} records/s"
+        if "upstream_requests_per_run" in result:
+            line += f"  {result['median_seconds'] * 1000:>9.1f} ms"
+            line += f"  {result['upstream_requests_per_run']:>5.1f} upstream/run"
+        print(line, file=sys.stderr)
+    if args.compare:
+        compare(report["results"], args.compare)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
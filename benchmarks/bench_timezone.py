@@ -0,0 +1,82 @@
+"""Records/sec for localizing timestamp strings, before and after offset caching.
+
+"before" reproduces the original per-field path: replace("Z", ...) plus
+fromisoformat, and a fresh timezone object parsed from the offset string for
+every timestamp. "after" is localize_records, which converts a whole page in
+one pass against the cached offset table. Outputs are asserted equal first.
+
+Usage:
+    uv run python -m benchmarks.bench_timezone [--records 1000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("WHOOP_ACCESS_TOKEN", "benchmark")
+
+from app.utils.timezone import TIMESTAMP_FIELDS, localize_records  # noqa: E402
+from benchmarks.records import make_records  # noqa: E402
+
+KINDS = ("cycle", "sleep", "workout")
+
+
+def _legacy_offset(offset_str: str) -> timezone:
+    sign = 1 if offset_str[0] == "+" else -1
+    hours, minutes = map(int, offset_str[1:].split(":"))
+    return timezone(timedelta(hours=sign * hours, minutes=sign * minutes))
+
+
+def before(records: list[dict]) -> list[dict]:
+    for record in records:
+        tz_offset = record.get("timezone_offset")
+        for field in TIMESTAMP_FIELDS:
+            if field in record and record[field] is not None:
+                value = record[field]
+                if isinstance(value, str):
+                    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                    record[field] = dt.astimezone(_legacy_offset(tz_offset)) if tz_offset else dt
+    return records
+
+
+def after(records: list[dict]) -> list[dict]:
+    return localize_records(records)
+
+
+def best_rate(fn, raw: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        batch = [dict(record) for record in raw]
+        started = time.perf_counter()
+        fn(batch)
+        best = min(best, time.perf_counter() - started)
+    return len(raw) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for kind in KINDS:
+        raw = make_records(kind, args.records)
+        expected = before([dict(record) for record in raw])
+        assert after([dict(record) for record in raw]) == expected, f"{kind}: outputs differ"
+        old = best_rate(before, raw, args.repeat)
+        new = best_rate(after, raw, args.repeat)
+        results[kind] = {
+            "before_records_per_sec": round(old),
+            "after_records_per_sec": round(new),
+            "speedup": round(new / old, 2),
+        }
+        print(f"{kind:<8} before {old:>10,.0f}/s  after {new:>10,.0f}/s  x{new / old:.2f}")
+
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Records/sec for decoding and validating collection pages, before and after batching.
+
+"before" is the original path: json.loads the page, preprocess_timestamps each
+record by hand, then Model(**record).model_dump() per record. "after" decodes
+the raw page bytes with a cached TypeAdapter (localizing in the validator) and
+dumps the page in one call.
+
+Usage:
+    uv run python -m benchmarks.bench_validation [--records 1000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("WHOOP_ACCESS_TOKEN", "benchmark")
+
+from app.schemas import Cycle, Recovery, Sleep, Workout  # noqa: E402
+from app.schemas.page import dump_records, page_adapter  # noqa: E402
+from app.utils.timezone import preprocess_timestamps  # noqa: E402
+from benchmarks.records import make_page  # noqa: E402
+
+MODELS = {"cycle": Cycle, "sleep": Sleep, "recovery": Recovery, "workout": Workout}
+PAGE_SIZE = 25
+
+
+def before(model, pages: list[bytes]) -> list[dict]:
+    out = []
+    for raw in pages:
+        for record in json.loads(raw)["records"]:
+            if model is not Recovery:
+                record = preprocess_timestamps(record)
+            out.append(model(**record).model_dump())
+    return out
+
+
+def after(model, pages: list[bytes]) -> list[dict]:
+    adapter = page_adapter(model)
+    out = []
+    for raw in pages:
+        out.extend(dump_records(model, adapter.validate_json(raw)["records"]))
+    return out
+
+
+def best_rate(fn, model, pages: list[bytes], records: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(model, pages)
+        best = min(best, time.perf_counter() - started)
+    return records / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for kind, model in MODELS.items():
+        pages = [
+            make_page(kind, PAGE_SIZE, seed=i) for i in range(0, args.records, PAGE_SIZE)
+        ]
+        count = len(pages) * PAGE_SIZE
+        assert before(model, pages) == after(model, pages), f"{kind}: outputs differ"
+        old = best_rate(before, model, pages, count, args.repeat)
+        new = best_rate(after, model, pages, count, args.repeat)
+        results[kind] = {
+            "before_records_per_sec": round(old),
+            "after_records_per_sec": round(new),
+            "speedup": round(new / old, 2),
+        }
+        print(f"{kind:<9} before {old:>10,.0f}/s  after {new:>10,.0f}/s  x{new / old:.2f}")
+
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
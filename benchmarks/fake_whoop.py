@@ -0,0 +1,203 @@
+"""In-process stand-in for the WHOOP API, served through httpx.MockTransport.
+
+Serves paginated /v2/cycle, /v2/activity/sleep, /v2/recovery and
+/v2/activity/workout from synthetic records (filtered by start/end and paged
+with limit/nextToken like the real API), the single-record and user endpoints
+the tools call, and the OAuth token endpoint. Per-request latency, periodic
+429s and access-token expiry (401 until the client refreshes) are configurable.
+"""
+
+import asyncio
+import re
+from collections import Counter
+from contextvars import ContextVar
+
+import httpx
+
+from app.config import settings
+from app.services.whoop_client import WhoopClient
+from app.utils.timezone import parse_iso_datetime
+from benchmarks.records import make_records
+
+COLLECTIONS = {
+    "/v2/cycle": "cycle",
+    "/v2/activity/sleep": "sleep",
+    "/v2/recovery": "recovery",
+    "/v2/activity/workout": "workout",
+}
+
+# Path templates the counters are keyed by, so /v2/cycle/123 and /v2/cycle/456 add up
+ROUTES = [
+    (re.compile(r"^/v2/cycle/(?P<id>\d+)/sleep$"), "/v2/cycle/{id}/sleep"),
+    (re.compile(r"^/v2/cycle/(?P<id>\d+)/recovery$"), "/v2/cycle/{id}/recovery"),
+    (re.compile(r"^/v2/cycle/(?P<id>\d+)$"), "/v2/cycle/{id}"),
+    (re.compile(r"^/v2/activity/sleep/(?P<id>[^/]+)$"), "/v2/activity/sleep/{id}"),
+    (re.compile(r"^/v2/activity/workout/(?P<id>[^/]+)$"), "/v2/activity/workout/{id}"),
+]
+
+# Set to a one-item list to count the API requests made within a context (e.g. one tool call)
+UPSTREAM_REQUESTS: ContextVar[list[int] | None] = ContextVar("upstream_requests", default=None)
+
+PROFILE = {
+    "user_id": 10129,
+    "email": "athlete@example.com",
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+}
+BODY = {"height_meter": 1.72, "weight_kilogram": 64.5, "max_heart_rate": 192}
+
+
+class FakeWhoop:
+    """Fake WHOOP backend with request counters.
+
+    Args:
+        records: Records generated per collection (newest first)
+        latency: Seconds each response is delayed by
+        rate_limit_every: Answer every Nth API request with 429 (Retry-After: 0)
+        expire_token_every: Rotate the access token after every Nth API request,
+            so the next request with the old token gets a 401
+        seed: Seed for the synthetic records
+    """
+
+    def __init__(
+        self,
+        records: int = 250,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        expire_token_every: int = 0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.expire_token_every = expire_token_every
+        self.base_path = httpx.URL(settings.whoop_api_base_url).path.rstrip("/")
+        self.collections = {
+            path: make_records(kind, records, seed) for path, kind in COLLECTIONS.items()
+        }
+        # Recoveries have no start; the API filters them by their cycle's time
+        self._times = {
+            path: [parse_iso_datetime(r.get("start") or r["created_at"]) for r in rows]
+            for path, rows in self.collections.items()
+        }
+        self._cycles = {str(r["id"]): r for r in self.collections["/v2/cycle"]}
+        self._sleeps = {r["id"]: r for r in self.collections["/v2/activity/sleep"]}
+        self._sleep_by_cycle = {r["cycle_id"]: r for r in self.collections["/v2/activity/sleep"]}
+        self._recovery_by_cycle = {r["cycle_id"]: r for r in self.collections["/v2/recovery"]}
+        self._workouts = {r["id"]: r for r in self.collections["/v2/activity/workout"]}
+        self.token_generation = 0
+        self.transport = httpx.MockTransport(self.handle)
+        self.reset_counters()
+
+    @property
+    def access_token(self) -> str:
+        return f"fake-access-{self.token_generation}"
+
+    def reset_counters(self) -> None:
+        self.requests = 0
+        self.calls: Counter[str] = Counter()
+        self.rate_limited = 0
+        self.unauthorized = 0
+        self.refreshes = 0
+
+    def counters(self) -> dict:
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "unauthorized": self.unauthorized,
+            "refreshes": self.refreshes,
+            "calls": dict(self.calls),
+        }
+
+    def attach(self, client: WhoopClient) -> WhoopClient:
+        """Point a client (e.g. the app's singleton) at this backend with refreshable tokens."""
+        client.transport = self.transport
+        client._http = None
+        client.token_store = None
+        client.access_token = self.access_token
+        client.refresh_token = "fake-refresh"
+        client.client_id = "fake-client"
+        client.client_secret = "fake-secret"
+        client.expires_at = None
+        client.cache.clear()
+        return client
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.method == "POST":
+            return self._refresh()
+
+        path = request.url.path.removeprefix(self.base_path)
+        self.requests += 1
+        self.calls[self._route(path)] += 1
+        counter = UPSTREAM_REQUESTS.get()
+        if counter is not None:
+            counter[0] += 1
+        if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+            self.rate_limited += 1
+            return httpx.Response(
+                429, headers={"Retry-After": "0"}, json={"message": "Too Many Requests"}
+            )
+        if request.headers.get("authorization") != f"Bearer {self.access_token}":
+            self.unauthorized += 1
+            return httpx.Response(401, json={"message": "Authorization was not valid"})
+        if self.expire_token_every and self.requests % self.expire_token_every == 0:
+            self.token_generation += 1
+        return self._serve(path, request.url.params)
+
+    def _refresh(self) -> httpx.Response:
+        self.refreshes += 1
+        return httpx.Response(
+            200,
+            json={
+                "access_token": self.access_token,
+                "refresh_token": "fake-refresh",
+                "expires_in": 3600,
+            },
+        )
+
+    def _route(self, path: str) -> str:
+        for pattern, template in ROUTES:
+            if pattern.match(path):
+                return template
+        return path
+
+    def _serve(self, path: str, params: httpx.QueryParams) -> httpx.Response:
+        if path in self.collections:
+            return httpx.Response(200, json=self._page(path, params))
+        if path == "/v2/user/profile/basic":
+            return httpx.Response(200, json=PROFILE)
+        if path == "/v2/user/measurement/body":
+            return httpx.Response(200, json=BODY)
+        for pattern, template in ROUTES:
+            match = pattern.match(path)
+            if match:
+                record = self._lookup(template, match["id"])
+                if record is not None:
+                    return httpx.Response(200, json=record)
+                break
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    def _lookup(self, template: str, record_id: str) -> dict | None:
+        if template == "/v2/cycle/{id}":
+            return self._cycles.get(record_id)
+        if template == "/v2/cycle/{id}/sleep":
+            return self._sleep_by_cycle.get(int(record_id))
+        if template == "/v2/cycle/{id}/recovery":
+            return self._recovery_by_cycle.get(int(record_id))
+        if template == "/v2/activity/sleep/{id}":
+            return self._sleeps.get(record_id)
+        return self._workouts.get(record_id)
+
+    def _page(self, path: str, params: httpx.QueryParams) -> dict:
+        start = parse_iso_datetime(params["start"]) if "start" in params else None
+        end = parse_iso_datetime(params["end"]) if "end" in params else None
+        rows = [
+            record
+            for record, at in zip(self.collections[path], self._times[path], strict=True)
+            if (start is None or at >= start) and (end is None or at < end)
+        ]
+        offset = int(params.get("nextToken", 0))
+        size = int(params.get("limit", 10))
+        next_token = str(offset + size) if offset + size < len(rows) else None
+        return {"records": rows[offset : offset + size], "next_token": next_token}
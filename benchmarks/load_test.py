@@ -0,0 +1,234 @@
+"""Concurrent-client load test of the MCP server against the fake WHOOP API.
+
+Opens N MCP client sessions to the real FastMCP server from app.main (over
+FastMCP's in-memory transport, so requests go through the full MCP protocol
+and middleware stack) and has each one issue a weighted mix of tool calls
+with random date ranges and ids. Reports throughput, p50/p95/p99 latency per
+tool, and upstream WHOOP requests per tool call (attributed with a server-side
+middleware, so concurrent calls don't blur together), as JSON.
+
+Usage:
+    uv run python -m benchmarks.load_test [--clients 10] [--calls 50]
+        [--latency-ms 20] [--rate-limit-every 0] [--expire-token-every 0]
+        [--no-cache] [--client-rate-limits] [--output load.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import AsyncExitStack
+from datetime import UTC, datetime, timedelta
+
+os.environ.setdefault("WHOOP_ACCESS_TOKEN", "benchmark")
+
+import numpy as np  # noqa: E402
+from fastmcp import Client  # noqa: E402
+from fastmcp.server.middleware import Middleware  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.main import mcp  # noqa: E402
+from app.services.cache import ResponseCache  # noqa: E402
+from app.services.rate_limit import RateLimiter  # noqa: E402
+from app.services.whoop_client import client  # noqa: E402
+from benchmarks.bench_suite import metadata  # noqa: E402
+from benchmarks.fake_whoop import UPSTREAM_REQUESTS, FakeWhoop  # noqa: E402
+
+# Tool name -> relative weight in the call mix
+MIX = {
+    "get_cycles": 3,
+    "get_sleeps": 3,
+    "get_recoveries": 3,
+    "get_workouts": 2,
+    "get_cycle": 2,
+    "get_sleep": 1,
+    "get_workout": 1,
+    "get_user": 1,
+    "get_daily_summaries": 1,
+    "summarize_metric": 1,
+}
+# First day of the synthetic records (see benchmarks/records.py)
+FIRST_DAY = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+class UpstreamPerCall(Middleware):
+    """Count the WHOOP requests each tool call makes, by tool name."""
+
+    def __init__(self):
+        self.counts: dict[str, list[int]] = defaultdict(list)
+
+    async def on_call_tool(self, context, call_next):
+        counter = [0]
+        token = UPSTREAM_REQUESTS.set(counter)
+        try:
+            return await call_next(context)
+        finally:
+            UPSTREAM_REQUESTS.reset(token)
+            self.counts[context.message.name].append(counter[0])
+
+
+def make_arguments(tool: str, rng: random.Random, fake: FakeWhoop, days: int) -> dict:
+    """Arguments for one call: a random 1-4 week window, or a random record id."""
+    if tool in ("get_cycle", "get_sleep", "get_workout"):
+        path, key, arg = {
+            "get_cycle": ("/v2/cycle", "id", "cycle_id"),
+            "get_sleep": ("/v2/activity/sleep", "id", "sleep_id"),
+            "get_workout": ("/v2/activity/workout", "id", "workout_id"),
+        }[tool]
+        return {arg: rng.choice(fake.collections[path])[key]}
+    if tool == "get_user":
+        return {}
+    span = rng.choice((7, 14, 28))
+    start = FIRST_DAY + timedelta(days=rng.randrange(max(days - span, 1)))
+    window = {
+        "start": start.isoformat().replace("+00:00", "Z"),
+        "end": (start + timedelta(days=span)).isoformat().replace("+00:00", "Z"),
+    }
+    if tool == "summarize_metric":
+        return {**window, "metric": rng.choice(("hrv", "recovery_score", "sleep_hours", "strain"))}
+    return {**window, "limit": 25}
+
+
+def configure(args: argparse.Namespace) -> FakeWhoop:
+    if not args.client_rate_limits:
+        settings.whoop_rate_limit_per_minute = 10**9
+        settings.whoop_rate_limit_per_day = 10**9
+        settings.whoop_rate_limit_burst = 10**9
+    client.rate_limiter = RateLimiter()
+    client.cache = ResponseCache(0 if args.no_cache else settings.whoop_cache_max_entries)
+    fake = FakeWhoop(
+        records=args.records,
+        latency=args.latency_ms / 1000,
+        rate_limit_every=args.rate_limit_every,
+        expire_token_every=args.expire_token_every,
+    )
+    fake.attach(client)
+    return fake
+
+
+async def run_client(
+    session: Client,
+    rng: random.Random,
+    fake: FakeWhoop,
+    args: argparse.Namespace,
+    latencies: dict[str, list[float]],
+    errors: Counter,
+) -> None:
+    tools, weights = list(MIX), list(MIX.values())
+    for _ in range(args.calls):
+        tool = rng.choices(tools, weights)[0]
+        arguments = make_arguments(tool, rng, fake, args.records)
+        started = time.perf_counter()
+        result = await session.call_tool(tool, arguments, raise_on_error=False)
+        latencies[tool].append(time.perf_counter() - started)
+        content = result.structured_content or {}
+        if result.is_error or "error" in content:
+            errors[tool] += 1
+
+
+def _ms(values: np.ndarray, q: float) -> float:
+    return round(float(np.percentile(values, q)) * 1000, 2)
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    fake = configure(args)
+    upstream = UpstreamPerCall()
+    mcp.add_middleware(upstream)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: Counter = Counter()
+
+    async with AsyncExitStack() as stack:
+        # Connect every session first so no session's lifespan exit overlaps the run
+        sessions = [await stack.enter_async_context(Client(mcp)) for _ in range(args.clients)]
+        fake.reset_counters()
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                run_client(session, random.Random(args.seed + i), fake, args, latencies, errors)
+                for i, session in enumerate(sessions)
+            )
+        )
+        duration = time.perf_counter() - started
+        cache = client.cache.stats()
+    await client.aclose()
+
+    total = sum(len(values) for values in latencies.values())
+    tools = {}
+    for tool in MIX:
+        if not latencies[tool]:
+            continue
+        values = np.array(latencies[tool])
+        calls = np.array(upstream.counts[tool])
+        tools[tool] = {
+            "calls": len(values),
+            "errors": errors[tool],
+            "p50_ms": _ms(values, 50),
+            "p95_ms": _ms(values, 95),
+            "p99_ms": _ms(values, 99),
+            "mean_ms": round(float(values.mean()) * 1000, 2),
+            "max_ms": round(float(values.max()) * 1000, 2),
+            "upstream_per_call": round(float(calls.mean()), 2),
+            "upstream_max": int(calls.max()),
+        }
+    return {
+        "meta": metadata(args),
+        "clients": args.clients,
+        "calls": total,
+        "errors": sum(errors.values()),
+        "duration_seconds": round(duration, 3),
+        "throughput_calls_per_sec": round(total / duration, 2),
+        "upstream": fake.counters(),
+        "cache": cache,
+        "tools": tools,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10, help="concurrent MCP sessions")
+    parser.add_argument("--calls", type=int, default=50, help="tool calls per client")
+    parser.add_argument("--records", type=int, default=365, help="days of fake history")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake upstream latency")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="429 every Nth request")
+    parser.add_argument(
+        "--expire-token-every", type=int, default=0, help="rotate the token every Nth request"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument(
+        "--client-rate-limits",
+        action="store_true",
+        help="keep WHOOP_RATE_LIMIT_* throttling (lifted by default)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    report = asyncio.run(run_load(args))
+
+    print(
+        f"{report['calls']} calls from {report['clients']} clients in "
+        f"{report['duration_seconds']}s: {report['throughput_calls_per_sec']} calls/s, "
+        f"{report['upstream']['requests']} upstream requests",
+        file=sys.stderr,
+    )
+    for tool, stats in report["tools"].items():
+        print(
+            f"{tool:<20} {stats['calls']:>5} calls  p50 {stats['p50_ms']:>8.1f}  "
+            f"p95 {stats['p95_ms']:>8.1f}  p99 {stats['p99_ms']:>8.1f} ms  "
+            f"{stats['upstream_per_call']:>5.2f} upstream/call",
+            file=sys.stderr,
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Synthetic WHOOP API records shaped like real /v2 collection responses."""
+
+import json
+import random
+from datetime import UTC, datetime, timedelta
+
+OFFSETS = ["-08:00", "-05:00", "+00:00", "+05:30"]
+
+
+def _iso(dt: datetime) -> str:
+    return dt.astimezone(UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def make_cycle(i: int, rng: random.Random) -> dict:
+    start = datetime(2024, 1, 1, 6, tzinfo=UTC) + timedelta(days=i, minutes=rng.randint(-90, 90))
+    return {
+        "id": 100000 + i,
+        "user_id": 10129,
+        "created_at": _iso(start + timedelta(minutes=5)),
+        "updated_at": _iso(start + timedelta(hours=25)),
+        "start": _iso(start),
+        "end": _iso(start + timedelta(hours=24)),
+        "timezone_offset": rng.choice(OFFSETS),
+        "score_state": "SCORED",
+        "score": {
+            "strain": round(rng.uniform(2, 20), 4),
+            "kilojoule": round(rng.uniform(6000, 16000), 2),
+            "average_heart_rate": rng.randint(55, 90),
+            "max_heart_rate": rng.randint(120, 190),
+        },
+    }
+
+
+def make_sleep(i: int, rng: random.Random) -> dict:
+    start = datetime(2024, 1, 1, 6, tzinfo=UTC) + timedelta(days=i, minutes=rng.randint(-90, 90))
+    return {
+        "id": f"ecfc6a15-4661-442f-a9a4-{i:012d}",
+        "cycle_id": 100000 + i,
+        "user_id": 10129,
+        "created_at": _iso(start + timedelta(hours=8)),
+        "updated_at": _iso(start + timedelta(hours=9)),
+        "start": _iso(start),
+        "end": _iso(start + timedelta(hours=7, minutes=rng.randint(0, 90))),
+        "timezone_offset": rng.choice(OFFSETS),
+        "nap": i % 7 == 0,
+        "score_state": "SCORED",
+        "score": {
+            "stage_summary": {
+                "total_in_bed_time_milli": rng.randint(20_000_000, 32_000_000),
+                "total_awake_time_milli": rng.randint(1_000_000, 4_000_000),
+                "total_no_data_time_milli": 0,
+                "total_light_sleep_time_milli": rng.randint(10_000_000, 16_000_000),
+                "total_slow_wave_sleep_time_milli": rng.randint(3_000_000, 8_000_000),
+                "total_rem_sleep_time_milli": rng.randint(4_000_000, 9_000_000),
+                "sleep_cycle_count": rng.randint(3, 6),
+                "disturbance_count": rng.randint(5, 20),
+            },
+            "sleep_needed": {
+                "baseline_milli": 27_395_716,
+                "need_from_sleep_debt_milli": rng.randint(0, 3_000_000),
+                "need_from_recent_strain_milli": rng.randint(0, 1_000_000),
+                "need_from_recent_nap_milli": 0,
+            },
+            "respiratory_rate": round(rng.uniform(13, 18), 4),
+            "sleep_performance_percentage": rng.randint(50, 100),
+            "sleep_consistency_percentage": rng.randint(50, 100),
+            "sleep_efficiency_percentage": round(rng.uniform(80, 99), 4),
+        },
+    }
+
+
+def make_recovery(i: int, rng: random.Random) -> dict:
+    created = datetime(2024, 1, 1, 14, tzinfo=UTC) + timedelta(days=i)
+    return {
+        "cycle_id": 100000 + i,
+        "sleep_id": f"ecfc6a15-4661-442f-a9a4-{i:012d}",
+        "user_id": 10129,
+        "created_at": _iso(created),
+        "updated_at": _iso(created + timedelta(minutes=10)),
+        "score_state": "SCORED",
+        "score": {
+            "user_calibrating": False,
+            "recovery_score": rng.randint(10, 99),
+            "resting_heart_rate": rng.randint(45, 70),
+            "hrv_rmssd_milli": round(rng.uniform(20, 120), 4),
+            "spo2_percentage": round(rng.uniform(94, 99), 4),
+            "skin_temp_celsius": round(rng.uniform(32, 35), 4),
+        },
+    }
+
+
+def make_workout(i: int, rng: random.Random) -> dict:
+    start = datetime(2024, 1, 1, 15, tzinfo=UTC) + timedelta(days=i, minutes=rng.randint(0, 300))
+    return {
+        "id": f"1f6bbcb1-ff15-4a4b-8b3e-{i:012d}",
+        "user_id": 10129,
+        "created_at": _iso(start + timedelta(hours=2)),
+        "updated_at": _iso(start + timedelta(hours=3)),
+        "start": _iso(start),
+        "end": _iso(start + timedelta(minutes=rng.randint(20, 120))),
+        "timezone_offset": rng.choice(OFFSETS),
+        "sport_id": rng.choice([0, 1, 44, 48, 63, 71]),
+        "score_state": "SCORED",
+        "score": {
+            "strain": round(rng.uniform(2, 18), 4),
+            "average_heart_rate": rng.randint(100, 160),
+            "max_heart_rate": rng.randint(150, 195),
+            "kilojoule": round(rng.uniform(500, 4000), 2),
+            "percent_recorded": 100,
+            "distance_meter": round(rng.uniform(0, 20000), 2),
+            "altitude_gain_meter": round(rng.uniform(0, 300), 2),
+            "altitude_change_meter": round(rng.uniform(-10, 10), 2),
+            "zone_duration": {
+                f"zone_{zone}_milli": rng.randint(0, 1_500_000)
+                for zone in ["zero", "one", "two", "three", "four", "five"]
+            },
+        },
+    }
+
+
+GENERATORS = {
+    "cycle": make_cycle,
+    "sleep": make_sleep,
+    "recovery": make_recovery,
+    "workout": make_workout,
+}
+
+
+def make_records(kind: str, count: int, seed: int = 0) -> list[dict]:
+    """Records of the given kind, newest first like the API returns them."""
+    rng = random.Random(seed)
+    return [GENERATORS[kind](i, rng) for i in range(count)][::-1]
+
+
+def make_page(kind: str, count: int, next_token: str | None = None, seed: int = 0) -> bytes:
+    return json.dumps(
+        {"records": make_records(kind, count, seed), "next_token": next_token}
+    ).encode()
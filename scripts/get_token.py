@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """OAuth helper script to obtain WHOOP access token."""
 
+import json
+import os
 import secrets
+import time
 import webbrowser
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
@@ -14,6 +17,7 @@ TOKEN_URL = "https://api.prod.whoop.com/oauth/oauth2/token"
 REDIRECT_PORT = 8888
 REDIRECT_URI = f"http://localhost:{REDIRECT_PORT}/callback"
 CONFIG_DIR = Path(__file__).parent.parent / "config"
+TOKEN_STORE_FILE = CONFIG_DIR / "tokens.json"
 
 SCOPES = [
     "offline",
@@ -102,6 +106,20 @@ def load_credentials_from_env() -> tuple[str, str]:
     return client_id, client_secret
 
 
+def save_token_store(tokens: dict) -> None:
+    """Write tokens to config/tokens.json, which the server prefers over config/.env."""
+    expires_in = tokens.get("expires_in")
+    data = {
+        "whoop_access_token": tokens["access_token"],
+        "whoop_refresh_token": tokens.get("refresh_token", ""),
+        "whoop_token_expires_at": time.time() + expires_in if expires_in else None,
+    }
+    tmp_file = TOKEN_STORE_FILE.with_suffix(".json.tmp")
+    tmp_file.write_text(json.dumps(data))
+    os.chmod(tmp_file, 0o600)
+    os.replace(tmp_file, TOKEN_STORE_FILE)
+
+
 def main():
     print("=" * 50)
     print("WHOOP OAuth Token Generator")
@@ -150,7 +168,10 @@ def main():
         print(f"WHOOP_REFRESH_TOKEN={tokens['refresh_token']}")
 
     print(f"\n# Token expires in {tokens.get('expires_in', 'unknown')} seconds")
-    print("# With refresh token configured, tokens will auto-refresh on expiry")
+    print("# With refresh token configured, tokens will auto-refresh before expiry")
+
+    save_token_store(tokens)
+    print(f"\nTokens also saved to {TOKEN_STORE_FILE}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+import os
+
+# Settings requires an access token at import time; tests never hit the real API.
+os.environ.setdefault("WHOOP_ACCESS_TOKEN", "test-token")
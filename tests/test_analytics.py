@@ -0,0 +1,268 @@
+from datetime import date
+
+import httpx
+import numpy as np
+import pytest
+from fastmcp import Client
+
+from app.main import mcp
+from app.services import analytics, collections
+from app.services.analytics import METRICS, Series, summarize
+from app.services.whoop_client import WhoopClient
+
+
+def _series(days: list[str], values: list[float]) -> Series:
+    dates = [date.fromisoformat(d) for d in days]
+    columns = {
+        "date": dates,
+        "weekday": [d.strftime("%A") for d in dates],
+        "is_weekend": [d.weekday() >= 5 for d in dates],
+    }
+    return Series.from_columns(columns, np.array(values, dtype=float))
+
+
+class TestSummarize:
+    def test_drops_missing_values_and_sorts(self):
+        series = _series(["2024-01-03", "2024-01-01", "2024-01-02"], [3, 1, np.nan])
+
+        assert series.values.tolist() == [1, 3]
+        assert str(series.days[0]) == "2024-01-01"
+
+    def test_weekly_rollup_starts_monday(self):
+        # 2024-01-07 is a Sunday, 2024-01-08 the following Monday
+        series = _series(["2024-01-01", "2024-01-07", "2024-01-08"], [10, 20, 40])
+
+        rollup = summarize(series, "week")["rollup"]
+
+        assert rollup[0] == {
+            "period_start": "2024-01-01",
+            "mean": 15.0,
+            "min": 10.0,
+            "max": 20.0,
+            "sum": 30.0,
+            "count": 2,
+        }
+        assert (rollup[1]["period_start"], rollup[1]["count"]) == ("2024-01-08", 1)
+
+    def test_monthly_rollup(self):
+        series = _series(["2024-01-31", "2024-02-01", "2024-02-29"], [1, 2, 4])
+
+        rollup = summarize(series, "month")["rollup"]
+
+        assert [(r["period_start"], r["mean"]) for r in rollup] == [
+            ("2024-01-01", 1.0),
+            ("2024-02-01", 3.0),
+        ]
+
+    def test_rolling_mean_skips_missing_days(self):
+        series = _series(["2024-01-01", "2024-01-02", "2024-01-05"], [1, 3, 8])
+
+        rolling = summarize(series, "day", window=2)["rolling_mean"]
+
+        assert rolling == [
+            {"date": "2024-01-01", "mean": 1.0},
+            {"date": "2024-01-02", "mean": 2.0},
+            {"date": "2024-01-05", "mean": 8.0},
+        ]
+
+    def test_weekday_split(self):
+        # Monday, Saturday, Sunday, next Monday
+        days = ["2024-01-01", "2024-01-06", "2024-01-07", "2024-01-08"]
+        series = _series(days, [10, 20, 30, 20])
+
+        summary = summarize(series)
+
+        assert summary["by_weekday"]["Monday"] == {"mean": 15.0, "count": 2}
+        assert "Tuesday" not in summary["by_weekday"]
+        assert summary["weekday"] == {"mean": 15.0, "count": 2}
+        assert summary["weekend"] == {"mean": 25.0, "count": 2}
+
+    def test_percentiles_and_overall(self):
+        days = [f"2024-01-{d:02d}" for d in range(1, 12)]
+        summary = summarize(_series(days, list(range(11))))
+
+        assert summary["percentiles"]["p50"] == 5.0
+        assert (summary["mean"], summary["min"], summary["max"]) == (5.0, 0.0, 10.0)
+        assert summary["count"] == 11
+
+    def test_empty(self):
+        assert summarize(_series([], [])) == {"count": 0}
+
+    def test_unknown_period(self):
+        with pytest.raises(ValueError, match="quarter"):
+            summarize(_series(["2024-01-01"], [1]), "quarter")
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/cycle"):
+        records = [
+            {
+                "id": 10 + i,
+                "user_id": 1,
+                "start": f"2024-01-{i + 1:02d}T14:00:00.000Z",
+                "end": f"2024-01-{i + 2:02d}T14:00:00.000Z",
+                "timezone_offset": "-08:00",
+                "score_state": "SCORED",
+            }
+            for i in range(3)
+        ]
+    elif request.url.path.endswith("/recovery"):
+        records = [
+            {
+                "cycle_id": 10 + i,
+                "sleep_id": f"s{i}",
+                "user_id": 1,
+                "score_state": "SCORED",
+                "score": {"hrv_rmssd_milli": 40.0 + i},
+            }
+            for i in (0, 2, 5)  # cycle 15 isn't in the range
+        ]
+    else:
+        records = [
+            {
+                "id": f"s{i}",
+                "user_id": 1,
+                "start": "2024-01-01T06:00:00.000Z",
+                "end": "2024-01-01T14:00:00.000Z",
+                "timezone_offset": "-08:00",
+                "nap": i == 1,
+                "score_state": "SCORED",
+                "score": {
+                    "stage_summary": {
+                        "total_light_sleep_time_milli": 3_600_000,
+                        "total_slow_wave_sleep_time_milli": 3_600_000,
+                        "total_rem_sleep_time_milli": 1_800_000,
+                    }
+                },
+            }
+            for i in range(2)
+        ]
+    return httpx.Response(200, json={"records": records, "next_token": None})
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    client = WhoopClient(transport=httpx.MockTransport(_handler), token_store=None)
+    monkeypatch.setattr(collections, "client", client)
+    yield client
+    await client.aclose()
+
+
+class TestLoadSeries:
+    async def test_recovery_takes_day_from_cycle(self, client):
+        series = await analytics.load_series(METRICS["hrv"], {}, 25)
+
+        assert series.values.tolist() == [40.0, 42.0]
+        assert [str(d) for d in series.days] == ["2024-01-02", "2024-01-04"]
+
+    async def test_sleep_sums_stages_and_skips_naps(self, client):
+        series = await analytics.load_series(METRICS["sleep_hours"], {}, 25)
+
+        assert series.values.tolist() == [2.5]
+
+
+def _workout_columns(rows: list[tuple[str, int, list[int] | None, float | None]]) -> dict:
+    zones = [zone_ms if zone_ms is not None else [None] * 6 for _, _, zone_ms, _ in rows]
+    columns = {
+        "date": [date.fromisoformat(day) for day, _, _, _ in rows],
+        "sport_id": [sport for _, sport, _, _ in rows],
+        "score.strain": [strain for _, _, _, strain in rows],
+        "score.kilojoule": [None] * len(rows),
+        "score.distance_meter": [None] * len(rows),
+    }
+    for i, name in enumerate(analytics.ZONE_COLUMNS):
+        columns[name] = [z[i] for z in zones]
+    return columns
+
+
+class TestTrainingLoad:
+    def test_groups_by_sport_and_week(self):
+        minute = 60_000
+        columns = _workout_columns(
+            [
+                ("2024-01-01", 0, [0, 10 * minute, 20 * minute, 0, 0, 0], 10.0),
+                ("2024-01-03", 1, [0, 0, 30 * minute, 0, 0, 0], 6.0),
+                ("2024-01-09", 0, None, None),
+            ]
+        )
+
+        load = analytics.training_load(columns)
+
+        assert load["workouts"] == 3
+        assert load["total"]["zone_minutes"] == [0, 10, 50, 0, 0, 0]
+        assert load["average"]["strain"] == 8.0
+        assert load["average"]["kilojoule"] is None
+        running = load["by_sport"][0]
+        assert (running["sport_id"], running["workouts"]) == (0, 2)
+        assert running["average"]["zone_minutes"][2] == 20.0
+        assert [(w["week_start"], w["workouts"]) for w in load["by_week"]] == [
+            ("2024-01-01", 2),
+            ("2024-01-08", 1),
+        ]
+        assert load["by_week"][0]["total"]["strain"] == 16.0
+
+    def test_no_workouts(self):
+        assert analytics.training_load(_workout_columns([])) == {"workouts": 0}
+
+
+class TestSleepRecovery:
+    def test_join_prefers_sleep_id_then_cycle_id(self):
+        sleeps = {"id": ["a", "b", "nap"], "cycle_id": [1, 2, 3], "nap": [False, False, True]}
+        recoveries = {"sleep_id": ["b", "missing", "gone", "x"], "cycle_id": [9, 1, 3, 7]}
+
+        assert analytics.join_sleep_recovery(sleeps, recoveries) == ([1, 0], [0, 1])
+
+    def test_lagged_correlations(self):
+        days = np.arange("2024-01-01", "2024-01-11", dtype="datetime64[D]")
+        x = np.arange(10, dtype=float)[:, None]
+        # y tracks x on the same day and x of the previous day at lag 1
+        y = np.column_stack([2 * x[:, 0], np.r_[np.nan, x[:-1, 0]]])
+
+        r, n = analytics.lagged_correlations(days, x, y, range(2))
+
+        assert r[0, 0, 0] == pytest.approx(1.0)
+        assert n[0, 0].tolist() == [10, 9]
+        assert r[1, 0, 1] == pytest.approx(1.0)
+        assert n[1, 0, 1] == 9
+
+    def test_lagged_correlations_too_few_pairs(self):
+        days = np.array(["2024-01-01", "2024-01-02"], dtype="datetime64[D]")
+        r, n = analytics.lagged_correlations(days, np.ones((2, 1)), np.ones((2, 1)), range(3))
+
+        assert np.isnan(r).all()
+        assert n[:, 0, 0].tolist() == [2, 1, 0]
+
+    async def test_analysis(self, client):
+        result = await analytics.sleep_recovery_analysis(
+            ["sleep_hours"], ["hrv"], {}, 25, max_lag=1
+        )
+
+        # Only recovery s0 matches a (non-nap) sleep
+        assert result["pairs"] == 1
+        assert result["series"] == {"date": ["2024-01-01"], "sleep_hours": [2.5], "hrv": [40.0]}
+        assert result["correlations"]["hrv"]["sleep_hours"] == {"r": [None, None], "n": [1, 0]}
+
+
+class TestToolErrors:
+    async def test_unknown_metric_is_an_error_result(self):
+        async with Client(mcp) as session:
+            result = await session.call_tool("summarize_metric", {"metric": "vo2max"})
+
+        assert result.structured_content["error"].startswith("Unknown metric 'vo2max'")
+
+    async def test_rolling_window_must_be_positive(self):
+        async with Client(mcp) as session:
+            for window in (0, -3):
+                result = await session.call_tool(
+                    "summarize_metric", {"metric": "recovery_score", "rolling_window": window}
+                )
+
+                assert result.structured_content["error"] == "rolling_window must be at least 1 day"
+
+    async def test_unknown_sleep_metric_is_an_error_result(self):
+        async with Client(mcp) as session:
+            result = await session.call_tool(
+                "analyze_sleep_recovery", {"sleep_metrics": ["hrv", "naps"]}
+            )
+
+        assert result.structured_content["error"].startswith("Unknown sleep metric(s) hrv, naps")
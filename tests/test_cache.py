@@ -0,0 +1,102 @@
+import httpx
+
+from app.services.cache import ResponseCache, cache_ttl
+from app.services.whoop_client import WhoopClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResponseCache:
+    def test_returns_copies(self):
+        cache = ResponseCache(10)
+        cache.set("a", {"start": "2024-01-01"}, ttl=60)
+
+        cache.get("a")["start"] = "mutated"
+
+        assert cache.get("a") == {"start": "2024-01-01"}
+
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(10, clock=clock)
+        cache.set("a", {}, ttl=60)
+
+        clock.now = 59
+        assert cache.get("a") == {}
+        clock.now = 60
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(2)
+        cache.set("a", {"v": 1}, ttl=60)
+        cache.set("b", {"v": 2}, ttl=60)
+        cache.get("a")
+        cache.set("c", {"v": 3}, ttl=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.stats()["evictions"] == 1
+
+    def test_counts_hits_and_misses(self):
+        cache = ResponseCache(10)
+        cache.get("a")
+        cache.set("a", {}, ttl=60)
+        cache.get("a")
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+class TestCacheTTL:
+    def test_final_records_live_longer(self):
+        scored = {"score_state": "SCORED", "end": "2024-01-02T00:00:00Z"}
+        ongoing = {"score_state": "SCORED", "end": None}
+        pending = {"score_state": "PENDING_SCORE", "end": "2024-01-02T00:00:00Z"}
+
+        assert cache_ttl("/v2/cycle/1", scored) > cache_ttl("/v2/cycle/1", ongoing)
+        assert cache_ttl("/v2/activity/sleep/abc", pending) == cache_ttl("/v2/cycle/1", ongoing)
+
+    def test_scored_recovery_is_final(self):
+        recovery = {"cycle_id": 1, "score_state": "SCORED"}
+        assert cache_ttl("/v2/cycle/1/recovery", recovery) == cache_ttl(
+            "/v2/cycle/1", {"score_state": "SCORED", "end": "2024-01-02T00:00:00Z"}
+        )
+
+    def test_collections_are_not_cached(self):
+        assert cache_ttl("/v2/cycle", {"records": []}) == 0
+
+
+class TestClientCaching:
+    async def test_repeated_get_hits_cache(self):
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(200, json={"id": 1, "score_state": "SCORED", "end": "x"})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+
+        first = await client.get("/v2/cycle/1")
+        first["end"] = "mutated"
+        second = await client.get("/v2/cycle/1")
+
+        assert calls == 1
+        assert second["end"] == "x"
+        await client.aclose()
+
+    async def test_pagination_bypasses_cache(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"records": [{"id": 1}], "next_token": None})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+
+        await client.get_paginated("/v2/cycle")
+
+        assert client.cache.stats()["misses"] == 0
+        await client.aclose()
@@ -0,0 +1,174 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.schemas.cycle import Cycle
+from app.services import collections
+from app.services.whoop_client import WhoopClient
+from app.utils.timezone import preprocess_timestamps
+
+
+class FakeContext:
+    def __init__(self):
+        self.progress: list[tuple[float, float | None]] = []
+
+    async def report_progress(self, progress: float, total: float | None = None) -> None:
+        self.progress.append((progress, total))
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    offset = int(request.url.params.get("nextToken", 0))
+    size = int(request.url.params["limit"])
+    records = [
+        {
+            "id": i,
+            "user_id": 1,
+            "start": "2024-01-15T18:30:00.000Z",
+            "end": "2024-01-16T02:30:00.000Z",
+            "timezone_offset": "-08:00",
+            "score_state": "SCORED",
+        }
+        for i in range(offset, offset + size)
+    ]
+    next_token = str(offset + size) if offset + size < 40 else None
+    return httpx.Response(200, json={"records": records, "next_token": next_token})
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    client = WhoopClient(transport=httpx.MockTransport(_handler), token_store=None)
+    monkeypatch.setattr(collections, "client", client)
+    yield client
+    await client.aclose()
+
+
+class TestFetchCollection:
+    async def test_validates_pages_and_reports_progress(self, client):
+        ctx = FakeContext()
+
+        result = await collections.fetch_collection("/v2/cycle", {}, 30, Cycle, ctx)
+
+        assert len(result["records"]) == 30
+        assert result["records"][0]["start"] == "2024-01-15 10:30 AM (-08:00)"
+        assert result["has_more"] is True
+        assert ctx.progress == [(25, 30), (30, 30)]
+
+    async def test_matches_buffered_path(self, client):
+        response = await client.get_paginated("/v2/cycle", {}, 40)
+        expected = [
+            Cycle(**preprocess_timestamps(r)).model_dump()
+            for r in response["records"]
+        ]
+
+        result = await collections.fetch_collection("/v2/cycle", {}, 40, Cycle)
+
+        assert result["records"] == expected
+        assert result["has_more"] is False
+
+    async def test_projects_fields(self, client):
+        result = await collections.fetch_collection(
+            "/v2/cycle", {}, 2, Cycle, fields=["id", "weekday", "score.strain"]
+        )
+
+        assert result["records"][0] == {"id": 0, "weekday": "Monday", "score": None}
+
+    async def test_columnar_matches_records(self, client):
+        rows = await collections.fetch_collection("/v2/cycle", {}, 30, Cycle)
+        result = await collections.fetch_collection("/v2/cycle", {}, 30, Cycle, columnar=True)
+
+        columns = result["columns"]
+        assert "records" not in result
+        assert columns["id"] == [r["id"] for r in rows["records"]]
+        assert columns["start"] == [r["start"] for r in rows["records"]]
+        assert columns["score.strain"] == [None] * 30
+        assert result["has_more"] is True
+
+    async def test_columnar_compact_with_fields(self, client):
+        result = await collections.fetch_collection(
+            "/v2/cycle",
+            {},
+            30,
+            Cycle,
+            fields=["id", "user_id", "score"],
+            compact=True,
+            columnar=True,
+        )
+
+        assert result["constants"] == {"user_id": 1}
+        assert list(result["columns"]) == ["id"]
+
+    async def test_unknown_field_rejected(self, client):
+        with pytest.raises(ValueError, match="score.nope"):
+            await collections.fetch_collection("/v2/cycle", {}, 2, Cycle, fields=["score.nope"])
+
+    async def test_compact_lifts_constants_and_drops_nulls(self, client):
+        full = await collections.fetch_collection("/v2/cycle", {}, 30, Cycle)
+        result = await collections.fetch_collection("/v2/cycle", {}, 30, Cycle, compact=True)
+
+        constants = result["constants"]
+        assert constants["user_id"] == 1
+        assert constants["timezone_offset"] == "-08:00"
+        assert "id" not in constants
+        assert result["records"][0] == {"id": 0}
+        assert [
+            {**constants, **record} for record in result["records"]
+        ] == [{k: v for k, v in r.items() if v is not None} for r in full["records"]]
+
+
+async def _numbers(n: int, produced: list[int] | None = None, fail_at: int | None = None):
+    for i in range(n):
+        if i == fail_at:
+            raise ValueError("page failed")
+        if produced is not None:
+            produced.append(i)
+        yield i
+
+
+class TestPrefetch:
+    async def test_preserves_order(self):
+        assert [i async for i in collections.prefetch(_numbers(10), depth=2)] == list(range(10))
+
+    async def test_bounded_lookahead(self):
+        produced: list[int] = []
+        items = collections.prefetch(_numbers(10, produced), depth=2)
+
+        assert await anext(items) == 0
+        await asyncio.sleep(0.01)
+
+        # One item handed out, two queued, one waiting on the full queue
+        assert len(produced) <= 4
+        await items.aclose()
+
+    async def test_reraises_producer_error(self):
+        with pytest.raises(ValueError):
+            [i async for i in collections.prefetch(_numbers(5, fail_at=3), depth=2)]
+
+    async def test_early_exit_cancels_producer(self):
+        produced: list[int] = []
+        items = collections.prefetch(_numbers(100, produced), depth=1)
+
+        await anext(items)
+        await items.aclose()
+        count = len(produced)
+        await asyncio.sleep(0.01)
+
+        assert len(produced) == count < 100
+
+    async def test_next_page_requested_while_current_is_processed(self, monkeypatch):
+        requested: list[str | None] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requested.append(request.url.params.get("nextToken"))
+            return _handler(request)
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        monkeypatch.setattr(collections, "client", client)
+        pages = collections.prefetch(collections.iter_collection("/v2/cycle", {}, 40), depth=1)
+
+        await anext(pages)
+        await asyncio.sleep(0.01)
+
+        assert requested == [None, "25"]
+        await pages.aclose()
+        await client.aclose()
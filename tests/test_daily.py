@@ -0,0 +1,167 @@
+from datetime import UTC, datetime, timedelta
+
+import httpx
+from fastmcp import Client
+
+from app.config import settings
+from app.main import mcp
+from app.services import collections
+from app.services.whoop_client import WhoopClient
+from app.tools.daily import join_daily_records
+from app.utils.timezone import preprocess_timestamps
+
+
+def _cycle(cycle_id, start, end):
+    return preprocess_timestamps(
+        {
+            "id": cycle_id,
+            "user_id": 1,
+            "start": start,
+            "end": end,
+            "timezone_offset": "-08:00",
+            "score_state": "SCORED",
+        }
+    )
+
+
+def _sleep(sleep_id, start, end, cycle_id=None, nap=False):
+    return preprocess_timestamps(
+        {
+            "id": sleep_id,
+            "cycle_id": cycle_id,
+            "user_id": 1,
+            "start": start,
+            "end": end,
+            "timezone_offset": "-08:00",
+            "nap": nap,
+            "score_state": "SCORED",
+        }
+    )
+
+
+def _workout(workout_id, start):
+    return preprocess_timestamps(
+        {
+            "id": workout_id,
+            "user_id": 1,
+            "start": start,
+            "end": start,
+            "timezone_offset": "-08:00",
+            "sport_id": 0,
+            "score_state": "SCORED",
+        }
+    )
+
+
+CYCLES = [
+    _cycle(2, "2024-01-16T06:00:00Z", None),
+    _cycle(1, "2024-01-15T06:00:00Z", "2024-01-16T06:00:00Z"),
+]
+
+
+class TestJoinDailyRecords:
+    def test_joins_recovery_and_primary_sleep(self):
+        sleeps = [
+            _sleep("s1", "2024-01-15T06:00:00Z", "2024-01-15T14:00:00Z"),
+            _sleep("nap", "2024-01-15T22:00:00Z", "2024-01-15T23:00:00Z", cycle_id=1, nap=True),
+        ]
+        recoveries = [{"cycle_id": 1, "sleep_id": "s1", "user_id": 1, "score_state": "SCORED"}]
+
+        days = join_daily_records(CYCLES, sleeps, recoveries, [])
+
+        assert [d["cycle"]["id"] for d in days] == [2, 1]
+        assert days[1]["sleep"]["id"] == "s1"
+        assert days[1]["recovery"]["cycle_id"] == 1
+        assert days[0]["sleep"] is None
+        assert days[0]["recovery"] is None
+
+    def test_falls_back_to_sleep_cycle_id(self):
+        sleeps = [_sleep("s2", "2024-01-16T06:00:00Z", "2024-01-16T14:00:00Z", cycle_id=2)]
+
+        days = join_daily_records(CYCLES, sleeps, [], [])
+
+        assert days[0]["sleep"]["id"] == "s2"
+
+    def test_assigns_workouts_by_time(self):
+        workouts = [
+            _workout("w-before", "2024-01-15T05:00:00Z"),
+            _workout("w1", "2024-01-15T18:00:00Z"),
+            _workout("w2", "2024-01-17T01:00:00Z"),
+        ]
+
+        days = join_daily_records(CYCLES, [], [], workouts)
+
+        assert [w["id"] for w in days[0]["workouts"]] == ["w2"]
+        assert [w["id"] for w in days[1]["workouts"]] == ["w1"]
+
+    def test_day_fields_come_from_cycle(self):
+        days = join_daily_records(CYCLES, [], [], [])
+
+        assert days[1]["date"] == days[1]["cycle"]["date"]
+        assert days[1]["weekday"] == "Monday"
+
+
+def _paged_handler(collections_by_path: dict[str, list[dict]]):
+    """Serve each path's records newest first, with offset-based next tokens."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        records = collections_by_path[request.url.path.removeprefix("/developer")]
+        offset = int(request.url.params.get("nextToken", 0))
+        page_end = offset + int(request.url.params["limit"])
+        return httpx.Response(
+            200,
+            json={
+                "records": records[offset:page_end],
+                "next_token": str(page_end) if page_end < len(records) else None,
+            },
+        )
+
+    return handler
+
+
+class TestGetDailySummaries:
+    async def test_related_collections_are_fetched_completely(self, monkeypatch):
+        def raw_workout(n, start):
+            start = start.isoformat().replace("+00:00", "Z")
+            return {
+                "id": f"w{n}",
+                "user_id": 1,
+                "start": start,
+                "end": start,
+                "timezone_offset": "-08:00",
+                "sport_id": 0,
+                "score_state": "SCORED",
+            }
+
+        cycles = [
+            {"id": 2, "start": "2024-01-16T06:00:00Z", "end": None},
+            {"id": 1, "start": "2024-01-15T06:00:00Z", "end": "2024-01-16T06:00:00Z"},
+        ]
+        for cycle in cycles:
+            cycle.update(user_id=1, timezone_offset="-08:00", score_state="SCORED")
+        # MAX_LIMIT workouts in the newer cycle push the older cycle's past MAX_LIMIT
+        newer = datetime(2024, 1, 17, tzinfo=UTC)
+        older = datetime(2024, 1, 15, 18, tzinfo=UTC)
+        workouts = [raw_workout(n, newer - timedelta(minutes=n)) for n in range(1000)]
+        workouts += [raw_workout(1000 + n, older - timedelta(minutes=n)) for n in range(5)]
+        handler = _paged_handler(
+            {
+                "/v2/cycle": cycles,
+                "/v2/activity/sleep": [],
+                "/v2/recovery": [],
+                "/v2/activity/workout": workouts,
+            }
+        )
+        # Over 40 workout pages; don't wait on the client-side rate limit
+        monkeypatch.setattr(settings, "whoop_rate_limit_burst", 100)
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        monkeypatch.setattr(collections, "client", client)
+
+        async with Client(mcp) as session:
+            result = await session.call_tool("get_daily_summaries", {"limit": 2})
+        await client.aclose()
+
+        days = result.structured_content["records"]
+        assert [d["cycle"]["id"] for d in days] == [2, 1]
+        assert len(days[0]["workouts"]) == 1000
+        assert [w["id"] for w in days[1]["workouts"]] == [f"w{n}" for n in range(1004, 999, -1)]
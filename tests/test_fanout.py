@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.services.fanout import fan_out, optional
+from app.services.whoop_client import WhoopAPIError
+
+
+async def _value(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _error(status_code, delay=0.0):
+    await asyncio.sleep(delay)
+    raise WhoopAPIError(status_code, "boom")
+
+
+class TestFanOut:
+    async def test_runs_concurrently_in_order(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        results = await fan_out(_value("a", 0.05), _value("b", 0.05), _value("c", 0.05))
+
+        assert results == ["a", "b", "c"]
+        assert loop.time() - started < 0.12
+
+    async def test_skipped_branches_are_none(self):
+        assert await fan_out(_value(1), None) == [1, None]
+
+    async def test_optional_turns_404_into_none(self):
+        assert await fan_out(_value(1), optional(_error(404))) == [1, None]
+
+    async def test_other_errors_propagate_and_cancel(self):
+        slow = asyncio.Event()
+
+        async def never_finishes():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                slow.set()
+
+        with pytest.raises(WhoopAPIError) as exc:
+            await fan_out(never_finishes(), optional(_error(500)))
+        assert exc.value.status_code == 500
+        assert slow.is_set()
@@ -0,0 +1,150 @@
+import httpx
+import pytest
+from fastmcp import Client
+
+from app.config import settings
+from app.main import mcp
+from app.services import collections, metrics
+from app.services.metrics import Registry, endpoint_label
+from app.services.whoop_client import WhoopClient
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+def _sample(text: str, prefix: str) -> float:
+    """Value of the first exposition line starting with `prefix`."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {prefix!r} in:\n{text}")
+
+
+class TestRegistry:
+    def test_render_openmetrics(self):
+        registry = Registry()
+        calls = registry.counter("calls", "Calls", ("tool",))
+        latency = registry.histogram("latency_seconds", "Latency", ("tool",), (0.1, 1.0))
+        calls.inc(tool="get_cycles")
+        calls.inc(2, tool="get_cycles")
+        latency.observe(0.05, tool="get_cycles")
+        latency.observe(0.5, tool="get_cycles")
+
+        lines = registry.render().splitlines()
+
+        assert lines[:3] == [
+            "# TYPE calls counter",
+            "# HELP calls Calls",
+            'calls_total{tool="get_cycles"} 3',
+        ]
+        assert 'latency_seconds_bucket{tool="get_cycles",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{tool="get_cycles",le="1"} 2' in lines
+        assert 'latency_seconds_bucket{tool="get_cycles",le="+Inf"} 2' in lines
+        assert 'latency_seconds_sum{tool="get_cycles"} 0.55' in lines
+        assert 'latency_seconds_count{tool="get_cycles"} 2' in lines
+        assert lines[-1] == "# EOF"
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        registry.counter("errors", "Errors", ("message",)).inc(message='say "hi"\n')
+
+        assert 'errors_total{message="say \\"hi\\"\\n"} 1' in registry.render()
+
+    def test_endpoint_label(self):
+        assert endpoint_label("/v2/cycle/93845/sleep") == "/v2/cycle/{id}/sleep"
+        assert (
+            endpoint_label("/v2/activity/sleep/ecfc6a15-4661-442f-a9a4-f160dd7afae8")
+            == "/v2/activity/sleep/{id}"
+        )
+        assert endpoint_label("/v2/activity/workout") == "/v2/activity/workout"
+
+
+class TestClientMetrics:
+    async def test_retries_and_pagination(self, monkeypatch):
+        monkeypatch.setattr(settings, "whoop_retry_backoff_base", 0.0)
+        responses = iter(
+            [
+                httpx.Response(503),
+                httpx.Response(200, json={"records": [{"id": 1}], "next_token": "n"}),
+                httpx.Response(200, json={"records": [{"id": 2}], "next_token": None}),
+            ]
+        )
+        client = WhoopClient(transport=httpx.MockTransport(lambda r: next(responses)))
+
+        await client.get_paginated("/v2/cycle", limit=50)
+        await client.aclose()
+        text = metrics.registry.render()
+
+        labels = 'method="GET",endpoint="/v2/cycle"'
+        assert _sample(text, f'whoop_upstream_requests_total{{{labels},status="503"}}') == 1
+        assert _sample(text, f'whoop_upstream_requests_total{{{labels},status="200"}}') == 2
+        retries = 'whoop_upstream_retries_total{endpoint="/v2/cycle",reason="5xx"}'
+        assert _sample(text, retries) == 1
+        assert _sample(text, 'whoop_pagination_pages_sum{endpoint="/v2/cycle"}') == 2
+        assert _sample(text, 'whoop_pagination_records_sum{endpoint="/v2/cycle"}') == 2
+
+    async def test_token_refresh_counted(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.method == "POST":
+                return httpx.Response(200, json={"access_token": "new"})
+            if request.headers["authorization"] != "Bearer new":
+                return httpx.Response(401)
+            return httpx.Response(200, json={})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        client.refresh_token, client.client_id, client.client_secret = "r", "id", "secret"
+
+        await client.get("/v2/user/profile/basic")
+        await client.aclose()
+
+        text = metrics.registry.render()
+        assert _sample(text, 'whoop_token_refreshes_total{outcome="success"}') == 1
+        labels = 'method="GET",endpoint="/v2/user/profile/basic",status="401"'
+        assert _sample(text, f"whoop_upstream_requests_total{{{labels}}}") == 1
+
+
+class TestServerMetrics:
+    async def test_tool_calls_and_stages(self, monkeypatch):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/cycle/404"):
+                return httpx.Response(404)
+            return httpx.Response(200, json={"records": [], "next_token": None})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        monkeypatch.setattr(collections, "client", client)
+        monkeypatch.setattr("app.tools.cycles.client", client)
+
+        async with Client(mcp) as session:
+            await session.call_tool("get_cycles", {"limit": 5})
+            await session.call_tool("get_cycle", {"cycle_id": 404})
+            unknown = await session.call_tool("get_cycles", {"fields": ["nope"]})
+            await session.call_tool("get_cycles", {"limit": "many"}, raise_on_error=False)
+            resource = await session.read_resource("whoop://metrics")
+        await client.aclose()
+
+        text = resource[0].text
+        assert _sample(text, 'whoop_tool_calls_total{tool="get_cycles",outcome="ok"}') == 1
+        assert _sample(text, 'whoop_tool_calls_total{tool="get_cycle",outcome="api_error"}') == 1
+        assert _sample(text, 'whoop_tool_calls_total{tool="get_cycles",outcome="api_error"}') == 1
+        assert _sample(text, 'whoop_tool_calls_total{tool="get_cycles",outcome="exception"}') == 1
+        assert _sample(text, 'whoop_tool_duration_seconds_count{tool="get_cycles"}') == 3
+        assert "Unknown field 'nope'" in unknown.structured_content["error"]
+        stage = 'whoop_stage_duration_seconds_count{stage="validate",model="Cycle"}'
+        assert _sample(text, stage) == 1
+        stage = 'whoop_stage_duration_seconds_count{stage="serialize",model="Cycle"}'
+        assert _sample(text, stage) == 1
+
+    async def test_http_endpoint(self):
+        metrics.TOOL_CALLS.inc(tool="get_user", outcome="ok")
+        transport = httpx.ASGITransport(app=mcp.http_app())
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.get("/metrics")
+
+        assert response.headers["content-type"].startswith("application/openmetrics-text")
+        assert 'whoop_tool_calls_total{tool="get_user",outcome="ok"} 1' in response.text
+        assert response.text.endswith("# EOF\n")
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+from pydantic_core import to_json
+
+from app.schemas import Cycle, Recovery, Sleep
+from app.schemas.page import (
+    column_paths,
+    compact_columns,
+    compact_records,
+    dump_columns,
+    dump_records,
+    dump_records_json,
+    field_include,
+    page_adapter,
+)
+from app.utils.timezone import preprocess_timestamps
+
+CYCLE = {
+    "id": 1,
+    "user_id": 1,
+    "start": "2024-01-15T18:30:00.000Z",
+    "end": "2024-01-16T02:30:00.000Z",
+    "timezone_offset": "+05:30",
+    "score_state": "SCORED",
+    "created_at": "2024-01-15T18:35:00.000Z",
+}
+
+
+class TestPageDecoding:
+    def test_decodes_raw_page_into_localized_models(self):
+        raw = json.dumps({"records": [CYCLE], "next_token": "abc"}).encode()
+
+        page = page_adapter(Cycle).validate_json(raw)
+
+        assert page["next_token"] == "abc"
+        cycle = page["records"][0]
+        assert isinstance(cycle, Cycle)
+        assert (cycle.start.hour, cycle.start.minute, cycle.start.day) == (0, 0, 16)
+        assert cycle.created_at.utcoffset() == cycle.start.utcoffset()
+
+    def test_missing_next_token(self):
+        page = page_adapter(Recovery).validate_json(b'{"records": []}')
+        assert page == {"records": []}
+
+    def test_adapters_are_cached(self):
+        assert page_adapter(Cycle) is page_adapter(Cycle)
+
+    def test_matches_preprocessed_path(self):
+        raw = json.dumps({"records": [CYCLE]}).encode()
+        expected = Cycle(**preprocess_timestamps(dict(CYCLE))).model_dump()
+
+        records = dump_records(Cycle, page_adapter(Cycle).validate_json(raw)["records"])
+
+        assert records == [expected]
+        assert records[0]["start"] == "2024-01-16 12:00 AM (+05:30)"
+
+    def test_dump_records_validates_raw_dicts(self):
+        assert dump_records(Cycle, [dict(CYCLE)])[0]["start"] == "2024-01-16 12:00 AM (+05:30)"
+
+    def test_dump_records_json_matches_dict_path(self):
+        records = page_adapter(Cycle).validate_json(json.dumps({"records": [CYCLE]}))["records"]
+
+        expected = to_json(dump_records(Cycle, records), fallback=str)
+        assert dump_records_json(Cycle, records) == expected
+
+    def test_day_fields_follow_localized_end(self):
+        cycle = Cycle(**CYCLE)
+
+        assert (cycle.date.isoformat(), cycle.weekday, cycle.is_weekend) == (
+            "2024-01-16",
+            "Tuesday",
+            False,
+        )
+        assert "_day" not in cycle.model_dump()
+
+
+class TestProjection:
+    def test_nested_paths(self):
+        include = field_include(Sleep, ["date", "score.stage_summary.sleep_cycle_count"])
+        assert include == {
+            "__all__": {"date": True, "score": {"stage_summary": {"sleep_cycle_count": True}}}
+        }
+
+    def test_whole_parent_wins(self):
+        assert field_include(Cycle, ["score.strain", "score"]) == {"__all__": {"score": True}}
+        assert field_include(Cycle, ["score", "score.strain"]) == {"__all__": {"score": True}}
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError, match="Unknown field 'start.hour'"):
+            field_include(Cycle, ["start.hour"])
+
+    def test_compact_keeps_differing_values(self):
+        constants, records = compact_records(
+            [{"a": 1, "b": None, "c": 1}, {"a": 1, "b": None, "c": 2}]
+        )
+        assert constants == {"a": 1}
+        assert records == [{"c": 1}, {"c": 2}]
+
+    def test_compact_single_record_has_no_constants(self):
+        assert compact_records([{"a": 1, "b": None}]) == ({}, [{"a": 1}])
+
+
+class TestColumns:
+    def test_paths_flatten_nested_models(self):
+        paths = column_paths(Sleep)
+        assert ("score", "stage_summary", "total_rem_sleep_time_milli") in paths
+        assert paths[-3:] == (("date",), ("weekday",), ("is_weekend",))
+
+    def test_dump_columns(self):
+        scored = {**CYCLE, "id": 2, "score": {"strain": 12.5}}
+        columns = dump_columns(Cycle, [dict(CYCLE), scored])
+
+        assert columns["id"] == [1, 2]
+        assert columns["score.strain"] == [None, 12.5]
+        assert columns["start"] == ["2024-01-16 12:00 AM (+05:30)"] * 2
+
+    def test_dump_columns_with_projection(self):
+        include = field_include(Cycle, ["id", "score.strain"])
+        assert dump_columns(Cycle, [dict(CYCLE)], include) == {"id": [1], "score.strain": [None]}
+
+    def test_compact_columns(self):
+        constants, columns = compact_columns({"a": [1, 1], "b": [None, None], "c": [1, 2]})
+        assert constants == {"a": 1}
+        assert columns == {"c": [1, 2]}
@@ -0,0 +1,104 @@
+import cProfile
+import pstats
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from app.config import settings
+from app.main import mcp
+from app.services import collections, profiling
+from app.services.whoop_client import WhoopClient
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"records": [], "next_token": None})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = WhoopClient(transport=httpx.MockTransport(_handler), token_store=None)
+    monkeypatch.setattr(collections, "client", client)
+    return client
+
+
+@pytest.fixture
+def profile_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "whoop_profile_dir", tmp_path / "profiles")
+    monkeypatch.setattr(settings, "whoop_profile_interval", 0.001)
+    return tmp_path / "profiles"
+
+
+async def _call(*tools: str) -> None:
+    async with Client(mcp) as session:
+        for tool in tools:
+            await session.call_tool(tool, {"limit": 1})
+
+
+class TestProfilingMiddleware:
+    async def test_off_by_default(self, client, profile_dir):
+        await _call("get_cycles")
+
+        assert not profile_dir.exists()
+
+    async def test_cprofile_selected_tool(self, client, profile_dir, monkeypatch):
+        monkeypatch.setattr(settings, "whoop_profile_mode", "cprofile")
+        monkeypatch.setattr(settings, "whoop_profile_tools", "get_sleeps, get_cycles")
+
+        await _call("get_cycles", "get_workouts")
+
+        names = sorted(path.name for path in profile_dir.iterdir())
+        assert len(names) == 2
+        assert all("-get_cycles-" in name for name in names)
+        assert names[0].endswith(".folded") and names[1].endswith(".prof")
+        stats = pstats.Stats(str(profile_dir / names[1]))
+        assert any(name == "fetch_collection" for _, _, name in stats.stats)
+        lines = [line.rsplit(" ", 1) for line in (profile_dir / names[0]).read_text().splitlines()]
+        assert all(int(weight) > 0 for _, weight in lines)
+        assert any(
+            ";" in stack and "fetch_collection (collections.py:" in stack for stack, _ in lines
+        )
+
+    async def test_sample_mode_writes_folded_stacks(self, client, profile_dir, monkeypatch):
+        monkeypatch.setattr(settings, "whoop_profile_mode", "sample")
+        monkeypatch.setattr(settings, "whoop_profile_min_seconds", 0.0)
+
+        await _call("get_cycles")
+
+        (folded,) = profile_dir.glob("*-get_cycles-*.folded")
+        assert not list(profile_dir.glob("*.prof"))
+        for line in folded.read_text().splitlines():
+            assert int(line.rsplit(" ", 1)[1]) > 0
+
+    async def test_sample_rate_and_min_seconds(self, client, profile_dir, monkeypatch):
+        monkeypatch.setattr(settings, "whoop_profile_mode", "cprofile")
+        monkeypatch.setattr(settings, "whoop_profile_sample_rate", 0.0)
+        await _call("get_cycles")
+
+        monkeypatch.setattr(settings, "whoop_profile_sample_rate", 1.0)
+        monkeypatch.setattr(settings, "whoop_profile_min_seconds", 60.0)
+        await _call("get_cycles")
+
+        assert not profile_dir.exists()
+
+
+def _leaf():
+    return sum(range(20_000))
+
+
+def _parent():
+    return _leaf() + _leaf()
+
+
+class TestFoldedStacks:
+    def test_reconstructs_call_paths(self):
+        profiler = cProfile.Profile()
+        profiler.runcall(_parent)
+
+        folded = profiling.folded_from_stats(pstats.Stats(profiler))
+
+        stacks = [line.rsplit(" ", 1)[0] for line in folded.splitlines()]
+        assert any(
+            stack.startswith("_parent (test_profiling.py:") and "_leaf (test_profiling.py:" in stack
+            for stack in stacks
+        )
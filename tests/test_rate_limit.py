@@ -0,0 +1,150 @@
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.rate_limit import RateLimiter, TokenBucket, backoff_delay, retry_after
+from app.services.whoop_client import WhoopAPIError, WhoopClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "whoop_retry_backoff_base", 0.0)
+
+
+class TestTokenBucket:
+    def test_allows_burst_then_waits(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+
+        assert bucket.try_take() == 0
+        assert bucket.try_take() == 0
+        assert bucket.try_take() == pytest.approx(1.0)
+
+        clock.now = 1.0
+        assert bucket.try_take() == 0
+
+    async def test_limiter_honors_pause(self):
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+        limiter.pause(5)
+        clock.now = 5
+
+        await limiter.acquire()
+
+    def test_exhausted_header_pauses(self):
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock)
+
+        limiter.observe({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "12"})
+
+        assert limiter._paused_until == 12
+
+
+class TestRetryAfter:
+    def test_seconds(self):
+        assert retry_after({"retry-after": "3"}) == 3
+
+    def test_http_date_in_past(self):
+        assert retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+
+    def test_falls_back_to_rate_limit_reset(self):
+        assert retry_after({"x-ratelimit-reset": "7, 3600"}) == 7
+
+    def test_missing(self):
+        assert retry_after({}) is None
+
+    def test_backoff_is_capped(self, monkeypatch):
+        monkeypatch.setattr(settings, "whoop_retry_backoff_base", 1.0)
+        monkeypatch.setattr(settings, "whoop_retry_backoff_max", 4.0)
+        assert all(0 <= backoff_delay(10) <= 4.0 for _ in range(100))
+
+
+class TestClientRetries:
+    async def test_retries_429_with_retry_after(self):
+        responses = iter(
+            [
+                httpx.Response(429, headers={"Retry-After": "0"}),
+                httpx.Response(200, json={"ok": True}),
+            ]
+        )
+        client = WhoopClient(
+            transport=httpx.MockTransport(lambda r: next(responses)), token_store=None
+        )
+
+        assert await client.get("/v2/user/profile/basic") == {"ok": True}
+        await client.aclose()
+
+    async def test_gives_up_after_max_retries(self):
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(503)
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+
+        with pytest.raises(WhoopAPIError) as exc:
+            await client.get("/v2/user/profile/basic")
+        assert exc.value.status_code == 503
+        assert calls == settings.whoop_max_retries + 1
+        await client.aclose()
+
+    async def test_long_retry_after_is_not_waited_for(self):
+        client = WhoopClient(
+            transport=httpx.MockTransport(
+                lambda r: httpx.Response(429, headers={"Retry-After": "3600"})
+            ),
+            token_store=None,
+        )
+
+        with pytest.raises(WhoopAPIError) as exc:
+            await client.get("/v2/user/profile/basic")
+        assert exc.value.status_code == 429
+        await client.aclose()
+
+    async def test_pagination_resumes_from_failed_page(self):
+        seen_tokens = []
+        failed = False
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal failed
+            token = request.url.params.get("nextToken")
+            seen_tokens.append(token)
+            if token == "page-2" and not failed:
+                failed = True
+                return httpx.Response(502)
+            if token is None:
+                return httpx.Response(200, json={"records": [{"id": 1}], "next_token": "page-2"})
+            return httpx.Response(200, json={"records": [{"id": 2}], "next_token": None})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+
+        result = await client.get_paginated("/v2/cycle", limit=50)
+
+        assert [r["id"] for r in result["records"]] == [1, 2]
+        assert seen_tokens == [None, "page-2", "page-2"]
+        await client.aclose()
+
+    async def test_retries_connection_errors(self):
+        attempts = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise httpx.ConnectError("connection reset")
+            return httpx.Response(200, json={"ok": True})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+
+        assert await client.get("/v2/user/profile/basic") == {"ok": True}
+        await client.aclose()
@@ -0,0 +1,139 @@
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.record_store import RecordStore
+from app.services.whoop_client import WhoopClient
+from app.utils.timezone import format_iso_datetime, parse_iso_datetime
+
+NOW = datetime.now(UTC)
+
+
+def _sleep(i: int, score_state: str = "SCORED", updated: datetime | None = None) -> dict:
+    start = NOW - timedelta(days=i, hours=8)
+    return {
+        "id": f"sleep-{i}",
+        "user_id": 1,
+        "start": format_iso_datetime(start),
+        "end": format_iso_datetime(start + timedelta(hours=7)),
+        "score_state": score_state,
+        "updated_at": format_iso_datetime(updated or start + timedelta(hours=8)),
+    }
+
+
+class FakeSleepAPI:
+    """Serves sleeps newest first, filtered by start/end, 25 per page."""
+
+    def __init__(self, records: list[dict]):
+        self.records = records
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        params = request.url.params
+        start = parse_iso_datetime(params["start"]) if "start" in params else None
+        end = parse_iso_datetime(params["end"]) if "end" in params else None
+        matching = sorted(
+            (
+                r
+                for r in self.records
+                if (start is None or parse_iso_datetime(r["start"]) >= start)
+                and (end is None or parse_iso_datetime(r["start"]) < end)
+            ),
+            key=lambda r: r["start"],
+            reverse=True,
+        )
+        offset = int(params.get("nextToken", 0))
+        page_end = offset + int(params["limit"])
+        return httpx.Response(
+            200,
+            json={
+                "records": matching[offset:page_end],
+                "next_token": str(page_end) if page_end < len(matching) else None,
+            },
+        )
+
+
+@pytest.fixture
+def api():
+    return FakeSleepAPI([_sleep(i) for i in range(60)])
+
+
+@pytest.fixture
+async def client(api):
+    client = WhoopClient(transport=httpx.MockTransport(api), token_store=None)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RecordStore(tmp_path / "records.db")
+    yield store
+    store.close()
+
+
+def _params(days_ago: int, until_days_ago: int | None = None) -> dict:
+    params = {"start": format_iso_datetime(NOW - timedelta(days=days_ago))}
+    if until_days_ago is not None:
+        params["end"] = format_iso_datetime(NOW - timedelta(days=until_days_ago))
+    return params
+
+
+class TestRecordStore:
+    async def test_matches_api_results(self, api, client, store):
+        expected = await client.get_paginated("/v2/activity/sleep", _params(30), 100)
+        result = await store.get_paginated(client, "/v2/activity/sleep", _params(30), 100)
+
+        assert result["records"] == expected["records"]
+        assert result["has_more"] is False
+
+    async def test_repeated_query_makes_no_upstream_calls(self, api, client, store):
+        await store.get_paginated(client, "/v2/activity/sleep", _params(30), 100)
+        calls = len(api.requests)
+
+        result = await store.get_paginated(client, "/v2/activity/sleep", _params(20), 5)
+
+        assert len(api.requests) == calls
+        assert [r["id"] for r in result["records"]] == [f"sleep-{i}" for i in range(5)]
+        assert result["has_more"] is True
+
+    async def test_older_range_is_backfilled_once(self, api, client, store):
+        await store.get_paginated(client, "/v2/activity/sleep", _params(10), 100)
+        api.requests.clear()
+
+        result = await store.get_paginated(client, "/v2/activity/sleep", _params(40, 5), 100)
+
+        assert {r.url.params["end"] for r in api.requests} == {_params(10)["start"]}
+        assert len(result["records"]) == 35
+
+    async def test_stale_sync_refetches_recent_and_updated(self, api, client, store, monkeypatch):
+        api.records[0] = _sleep(0, score_state="PENDING_SCORE")
+        await store.get_paginated(client, "/v2/activity/sleep", _params(30), 100)
+
+        api.records[0] = _sleep(0, updated=NOW)
+        api.records.append(_sleep(-0.5))
+        api.requests.clear()
+        monkeypatch.setattr(settings, "whoop_record_store_sync_interval", 0)
+
+        result = await store.get_paginated(client, "/v2/activity/sleep", _params(30), 100)
+
+        assert len(api.requests) == 1
+        assert result["records"][0]["id"] == "sleep--0.5"
+        assert result["records"][1]["score_state"] == "SCORED"
+
+    async def test_query_without_start_goes_to_api(self, api, client, store):
+        result = await store.get_paginated(client, "/v2/activity/sleep", {}, 10)
+
+        assert len(api.requests) == 1
+        assert len(result["records"]) == 10
+        assert result["has_more"] is True
+
+    async def test_get_all_returns_whole_window(self, api, client, store):
+        await store.get_paginated(client, "/v2/activity/sleep", _params(30), 5)
+
+        records = await store.get_all(client, "/v2/activity/sleep", _params(30))
+
+        assert [r["id"] for r in records] == [f"sleep-{i}" for i in range(30)]
@@ -1,17 +1,57 @@
 """Tests for timezone utilities."""
 
-from datetime import datetime, timezone, timedelta
+from datetime import UTC, datetime, timedelta, timezone
 
 import pytest
 
 from app.utils.timezone import (
-    parse_timezone_offset,
     convert_to_local_time,
-    preprocess_timestamps,
+    format_local_datetime,
+    localize_records,
+    parse_timezone_offset,
     preprocess_response,
+    preprocess_timestamps,
 )
 
 
+class TestLocalizeRecords:
+    def test_matches_per_record_conversion(self):
+        records = [
+            {"start": "2024-01-15T18:30:00Z", "end": None, "timezone_offset": "-08:00"},
+            {
+                "start": "2024-01-15T18:30:00Z",
+                "end": "2024-01-16T02:30:00Z",
+                "timezone_offset": "+05:30",
+            },
+            {"start": "2024-01-15T18:30:00Z", "timezone_offset": None},
+        ]
+        expected = [preprocess_timestamps(dict(r)) for r in records]
+        assert localize_records([dict(r) for r in records]) == expected
+
+    def test_records_share_cached_tzinfo(self):
+        records = localize_records([
+            {"start": "2024-01-15T18:30:00Z", "timezone_offset": "-05:00"},
+            {"start": "2024-01-16T18:30:00Z", "timezone_offset": "-05:00"},
+        ])
+        assert records[0]["start"].tzinfo is records[1]["start"].tzinfo
+        assert records[0]["start"].tzinfo is parse_timezone_offset("-05:00")
+
+
+class TestFormatLocalDatetime:
+    @pytest.mark.parametrize("hour", [0, 1, 11, 12, 13, 23])
+    def test_matches_strftime(self, hour):
+        tz = timezone(timedelta(hours=-8))
+        dt = datetime(2024, 1, 15, hour, 7, tzinfo=tz)
+        expected = f"{dt.strftime('%Y-%m-%d %I:%M %p')} (-08:00)"
+        assert format_local_datetime(dt, "-08:00") == expected
+
+    def test_same_instant_in_other_zone_not_reused(self):
+        utc = datetime(2024, 1, 15, 18, 0, tzinfo=UTC)
+        local = utc.astimezone(timezone(timedelta(hours=-8)))
+        assert format_local_datetime(utc, "+00:00") == "2024-01-15 06:00 PM (+00:00)"
+        assert format_local_datetime(local, "+00:00") == "2024-01-15 10:00 AM (+00:00)"
+
+
 class TestParseTimezoneOffset:
     def test_positive_offset(self):
         tz = parse_timezone_offset("+05:30")
@@ -0,0 +1,109 @@
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from app.main import mcp
+from app.schemas import Cycle
+from app.services import collections, tracing
+from app.services.whoop_client import WhoopClient
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans: list[dict] = []
+
+    def export(self, span: dict) -> None:
+        self.spans.append(span)
+
+    def named(self, name: str) -> list[dict]:
+        return [s for s in self.spans if s["name"] == name]
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = ListExporter()
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+    return exporter
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    cycle = {"id": 1, "user_id": 1, "start": "2024-01-01T00:00:00Z", "score_state": "PENDING_SCORE"}
+    if "nextToken" in request.url.params:
+        return httpx.Response(200, json={"records": [{**cycle, "id": 2}], "next_token": None})
+    return httpx.Response(200, json={"records": [cycle], "next_token": "n"})
+
+
+class TestSpans:
+    def test_disabled_returns_noop(self):
+        assert not tracing.enabled()
+        assert tracing.span("anything", records=1) is tracing.NOOP_SPAN
+
+    def test_nesting_and_errors(self, exporter):
+        with (
+            pytest.raises(ValueError),
+            tracing.span("outer", kind="test") as outer,
+            tracing.span("inner"),
+        ):
+            raise ValueError("boom")
+
+        inner, parent = exporter.spans
+        assert inner["parent_span_id"] == outer.span_id
+        assert inner["trace_id"] == parent["trace_id"]
+        assert parent["parent_span_id"] is None
+        assert (inner["status"], parent["status"]) == ("ERROR", "ERROR")
+        assert parent["attributes"]["kind"] == "test"
+
+    def test_file_exporter(self, tmp_path):
+        path = tmp_path / "traces" / "spans.jsonl"
+        tracing.configure("file", path)
+        try:
+            with tracing.span("one", records=3):
+                pass
+        finally:
+            tracing.configure("off")
+
+        (line,) = path.read_text().splitlines()
+        span = json.loads(line)
+        assert (span["name"], span["attributes"], span["status"]) == ("one", {"records": 3}, "OK")
+        assert span["end_time_unix_nano"] >= span["start_time_unix_nano"]
+
+
+class TestClientSpans:
+    async def test_pages_nest_under_query(self, exporter):
+        client = WhoopClient(transport=httpx.MockTransport(_handler), token_store=None)
+
+        async for _ in client.iter_pages("/v2/cycle", limit=50, model=Cycle):
+            pass
+        await client.aclose()
+
+        (query,) = exporter.named("whoop.paginate")
+        pages = exporter.named("whoop.page")
+        assert query["attributes"]["records"] == 2
+        assert [p["attributes"]["page"] for p in pages] == [0, 1]
+        assert all(p["parent_span_id"] == query["span_id"] for p in pages)
+        page_ids = {p["span_id"] for p in pages}
+        http = exporter.named("whoop.http")
+        assert len(http) == 2 and all(h["parent_span_id"] in page_ids for h in http)
+        assert http[0]["attributes"]["status_code"] == 200
+        assert http[0]["attributes"]["bytes"] > 0
+        validate = exporter.named("whoop.validate")
+        assert [v["attributes"]["records"] for v in validate] == [1, 1]
+
+
+class TestToolSpans:
+    async def test_tool_call_is_root(self, exporter, monkeypatch):
+        client = WhoopClient(transport=httpx.MockTransport(_handler), token_store=None)
+        monkeypatch.setattr(collections, "client", client)
+
+        async with Client(mcp) as session:
+            await session.call_tool("get_cycles", {"limit": 2})
+        await client.aclose()
+
+        (root,) = exporter.named("tool/get_cycles")
+        assert root["parent_span_id"] is None
+        assert root["attributes"]["response_bytes"] > 0
+        assert all(s["trace_id"] == root["trace_id"] for s in exporter.spans)
+        serialize = exporter.named("whoop.serialize")
+        assert sum(s["attributes"]["records"] for s in serialize) == 2
@@ -1,6 +1,18 @@
+import asyncio
+import json
+import time
+from datetime import UTC, datetime, timedelta
+
+import httpx
 import pytest
 
-from app.services.whoop_client import MAX_LIMIT, WhoopClient
+from app.services.whoop_client import (
+    MAX_LIMIT,
+    WhoopAPIError,
+    WhoopClient,
+    _split_window,
+)
+from app.utils.timezone import parse_iso_datetime
 
 
 class TestWhoopClient:
@@ -12,3 +24,337 @@ class TestWhoopClient:
         client = WhoopClient()
         assert "Authorization" in client.headers
         assert client.headers["Authorization"].startswith("Bearer ")
+
+
+class TestConnectionPool:
+    async def test_pages_share_one_http_client(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if "nextToken" in request.url.params:
+                return httpx.Response(200, json={"records": [{"id": 2}], "next_token": None})
+            return httpx.Response(200, json={"records": [{"id": 1}], "next_token": "abc"})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler))
+        http = client._get_http_client()
+        result = await client.get_paginated("/v2/cycle", limit=50)
+
+        assert [r["id"] for r in result["records"]] == [1, 2]
+        assert client._get_http_client() is http
+        await client.aclose()
+
+    async def test_aclose_releases_pool(self):
+        client = WhoopClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json={})))
+        await client.get("/v2/user/profile/basic")
+        http = client._get_http_client()
+
+        await client.aclose()
+
+        assert http.is_closed
+        assert client._http is None
+
+
+class TestTokenRefresh:
+    async def test_concurrent_401s_refresh_once(self):
+        refreshes = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal refreshes
+            if request.url.path.endswith("/token"):
+                refreshes += 1
+                await asyncio.sleep(0.01)
+                return httpx.Response(200, json={"access_token": f"new-{refreshes}"})
+            if request.headers["Authorization"] == "Bearer stale":
+                return httpx.Response(401)
+            return httpx.Response(200, json={"token": request.headers["Authorization"]})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        client.access_token = "stale"
+        client.refresh_token = "refresh"
+        client.client_id = "id"
+        client.client_secret = "secret"
+
+        results = await asyncio.gather(*(client.get(f"/v2/cycle/{i}") for i in range(5)))
+
+        assert refreshes == 1
+        assert all(r == {"token": "Bearer new-1"} for r in results)
+        await client.aclose()
+
+    async def test_failed_refresh_raises_401(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/token"):
+                return httpx.Response(400, text="invalid_grant")
+            return httpx.Response(401)
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        client.refresh_token = "refresh"
+        client.client_id = "id"
+        client.client_secret = "secret"
+
+        with pytest.raises(WhoopAPIError) as exc:
+            await client.get("/v2/cycle/1")
+        assert exc.value.status_code == 401
+        await client.aclose()
+
+
+class TestTokenLifecycle:
+    @staticmethod
+    def _client(handler, token_store=None) -> WhoopClient:
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=token_store)
+        client.access_token = "old"
+        client.refresh_token = "refresh"
+        client.client_id = "id"
+        client.client_secret = "secret"
+        return client
+
+    async def test_refreshes_before_expiry_without_401(self, tmp_path):
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/token"):
+                return httpx.Response(
+                    200,
+                    json={"access_token": "new", "refresh_token": "rotated", "expires_in": 3600},
+                )
+            seen.append(request.headers["Authorization"])
+            return httpx.Response(200, json={})
+
+        client = self._client(handler, token_store=tmp_path / "tokens.json")
+        client.expires_at = time.time() + 10
+
+        await client.get("/v2/user/profile/basic")
+
+        assert seen == ["Bearer new"]
+        assert client.expires_at == pytest.approx(time.time() + 3600, abs=5)
+        await client.aclose()
+
+    async def test_refresh_persists_tokens(self, tmp_path):
+        store = tmp_path / "tokens.json"
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200, json={"access_token": "new", "refresh_token": "rotated", "expires_in": 3600}
+            )
+
+        client = self._client(handler, token_store=store)
+
+        assert await client._refresh_access_token()
+
+        data = json.loads(store.read_text())
+        assert data["whoop_access_token"] == "new"
+        assert data["whoop_refresh_token"] == "rotated"
+        assert data["whoop_token_expires_at"] == client.expires_at
+        assert list(tmp_path.iterdir()) == [store]
+        await client.aclose()
+
+    async def test_background_refresh(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"access_token": "new", "expires_in": 3600})
+
+        client = self._client(handler)
+        client.expires_at = time.time() + 1
+
+        client.start_token_refresh()
+        for _ in range(100):
+            if client.access_token == "new":
+                break
+            await asyncio.sleep(0.01)
+
+        assert client.access_token == "new"
+        await client.aclose()
+
+    async def test_failed_proactive_refresh_falls_back_to_401(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/token"):
+                return httpx.Response(400)
+            return httpx.Response(200, json={})
+
+        client = self._client(handler)
+        client.expires_at = time.time() - 1
+
+        await client.get("/v2/user/profile/basic")
+
+        assert client.expires_at is None
+        await client.aclose()
+
+
+def _daily_cycles_handler(
+    days: int, requests: list[httpx.Request] | None = None, per_day: int = 1
+):
+    """Serve `per_day` cycles a day from 2024-01-01, newest first, filtered by start/end."""
+    origin = datetime(2024, 1, 1, tzinfo=UTC)
+    cycles = [
+        {"id": i, "start": (origin + timedelta(days=i / per_day, hours=6)).isoformat()}
+        for i in range(days * per_day)
+    ][::-1]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        params = request.url.params
+        start = parse_iso_datetime(params["start"]) if "start" in params else None
+        end = parse_iso_datetime(params["end"]) if "end" in params else None
+        matching = [
+            c
+            for c in cycles
+            if (start is None or parse_iso_datetime(c["start"]) >= start)
+            and (end is None or parse_iso_datetime(c["start"]) < end)
+        ]
+        offset = int(params.get("nextToken", 0))
+        page_end = offset + int(params["limit"])
+        return httpx.Response(
+            200,
+            json={
+                "records": matching[offset:page_end],
+                "next_token": str(page_end) if page_end < len(matching) else None,
+            },
+        )
+
+    return handler
+
+
+class TestShardedPagination:
+    window = {"start": "2024-01-01T00:00:00Z", "end": "2024-04-01T00:00:00Z"}
+
+    async def test_matches_serial_order(self):
+        client = WhoopClient(transport=httpx.MockTransport(_daily_cycles_handler(120)))
+
+        serial = await client.get_paginated("/v2/cycle", self.window, limit=200, shards=1)
+        sharded = await client.get_paginated("/v2/cycle", self.window, limit=200, shards=4)
+
+        assert [r["id"] for r in sharded["records"]] == [r["id"] for r in serial["records"]]
+        assert len(sharded["records"]) == 91
+        assert sharded["has_more"] is False
+        await client.aclose()
+
+    async def test_respects_limit_and_has_more(self):
+        client = WhoopClient(transport=httpx.MockTransport(_daily_cycles_handler(120)))
+
+        result = await client.get_paginated("/v2/cycle", self.window, limit=50, shards=4)
+
+        assert [r["id"] for r in result["records"]] == list(range(90, 40, -1))
+        assert result["has_more"] is True
+        assert result["next_token"] is None
+        await client.aclose()
+
+    async def test_requests_use_sub_ranges(self):
+        requests: list[httpx.Request] = []
+        client = WhoopClient(transport=httpx.MockTransport(_daily_cycles_handler(120, requests)))
+
+        await client.get_paginated("/v2/cycle", self.window, limit=200, shards=3)
+
+        windows = {(r.url.params["start"], r.url.params["end"]) for r in requests}
+        assert len(windows) == 3
+        assert ("2024-01-01T00:00:00Z", "2024-01-31T08:00:00.000Z") in windows
+        await client.aclose()
+
+    async def test_older_shards_stop_once_newer_fill_limit(self):
+        requests: list[httpx.Request] = []
+        handler = _daily_cycles_handler(120, requests, per_day=20)
+        client = WhoopClient(transport=httpx.MockTransport(handler))
+
+        serial = await client.get_paginated("/v2/cycle", self.window, limit=100, shards=1)
+        requests.clear()
+        sharded = await client.get_paginated("/v2/cycle", self.window, limit=100, shards=4)
+
+        assert [r["id"] for r in sharded["records"]] == [r["id"] for r in serial["records"]]
+        assert sharded["has_more"] is True
+        # The newest shard's 4 pages fill limit; each older shard stops after its first page
+        assert len(requests) == 4 + 3
+        await client.aclose()
+
+    def test_short_or_open_windows_are_not_split(self):
+        assert _split_window(None, None, 4) is None
+        assert _split_window("2024-01-01T00:00:00Z", "2024-01-02T12:00:00Z", 4) is None
+        assert _split_window("not-a-date", None, 4) is None
+
+
+class TestRequestCoalescing:
+    async def test_identical_concurrent_gets_share_one_request(self):
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"user_id": 1})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        client.cache.max_entries = 0
+
+        results = await asyncio.gather(*(client.get("/v2/user/profile/basic") for _ in range(5)))
+
+        assert calls == 1
+        assert results == [{"user_id": 1}] * 5
+        assert len({id(r) for r in results}) == 5
+        await client.aclose()
+
+    async def test_different_params_are_not_shared(self):
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"records": [], "next_token": None})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+
+        await asyncio.gather(
+            client.get_paginated("/v2/cycle", {"start": "2024-01-01T00:00:00Z"}),
+            client.get_paginated("/v2/cycle", {"start": "2024-02-01T00:00:00Z"}),
+        )
+
+        assert calls == 2
+        await client.aclose()
+
+    async def test_cancelled_caller_does_not_fail_others(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, json={"user_id": 1})
+
+        client = WhoopClient(transport=httpx.MockTransport(handler), token_store=None)
+        first = asyncio.ensure_future(client.get("/v2/user/profile/basic"))
+        second = asyncio.ensure_future(client.get("/v2/user/profile/basic"))
+        await asyncio.sleep(0.005)
+
+        first.cancel()
+
+        assert await second == {"user_id": 1}
+        assert client._in_flight == {}
+        await client.aclose()
+
+
+class TestIterPages:
+    async def test_yields_each_page_with_final_state_last(self):
+        client = WhoopClient(
+            transport=httpx.MockTransport(_daily_cycles_handler(60)), token_store=None
+        )
+
+        pages = [page async for page in client.iter_pages("/v2/cycle", limit=55)]
+
+        assert [len(p["records"]) for p in pages] == [25, 25, 5]
+        assert pages[-1]["has_more"] is True
+        assert pages[-1]["next_token"] == "55"
+        await client.aclose()
+
+    async def test_iter_records_stops_at_limit(self):
+        client = WhoopClient(
+            transport=httpx.MockTransport(_daily_cycles_handler(60)), token_store=None
+        )
+
+        ids = [record["id"] async for record in client.iter_records("/v2/cycle", limit=30)]
+
+        assert ids == list(range(59, 29, -1))
+        await client.aclose()
+
+    async def test_sharded_pages_stream_per_window(self):
+        client = WhoopClient(
+            transport=httpx.MockTransport(_daily_cycles_handler(120)), token_store=None
+        )
+        window = {"start": "2024-01-01T00:00:00Z", "end": "2024-04-01T00:00:00Z"}
+
+        pages = [p async for p in client.iter_pages("/v2/cycle", window, limit=200, shards=3)]
+
+        assert len(pages) == 3
+        assert sum(len(p["records"]) for p in pages) == 91
+        assert pages[-1]["has_more"] is False
+        await client.aclose()